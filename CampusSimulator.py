@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Discrete-event campus simulator for load and capacity testing
+
+Drives every location in dining-locations.json (optionally replicated
+across several simulated campuses) with meal-time arrival peaks, party
+sizes, dwell times and capacity limits, using the opening hours parsed by
+ConfiguredRestaurant. Each door crossing is emitted as a sequenced sensor
+delta into the real gateway pipeline (FusionAggregator), whose fused
+crowd levels are published to a stub uplink server or, optionally, to
+real SensorClient instances.
+
+Simulated time only advances from event to event, so a day of campus
+traffic runs in seconds to minutes.
+
+Usage:
+    from CampusSimulator import CampusSimulator
+
+    sim = CampusSimulator("dining-locations.json", campuses=100, seed=7)
+    report = sim.run(days=1)
+    print(report['uplink']['peak_requests_per_minute'])
+
+    # or from the shell
+    python CampusSimulator.py hackokstate25/dining-locations.json --campuses 100 --days 1
+"""
+
+import argparse
+import heapq
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from RestaurantDefining import RestaurantManager, ConfiguredRestaurant
+from SensorClient import encode_updates
+from SensorFusion import FusionAggregator
+
+SECONDS_PER_DAY = 86400
+
+# Meal-time demand peaks as (hour of day, relative height, width in hours)
+MEAL_PEAKS = [(7.75, 0.55, 1.0), (12.25, 1.0, 1.0), (18.0, 0.85, 1.25), (21.5, 0.3, 1.0)]
+BASELINE_DEMAND = 0.1
+
+# Event kinds; the heap orders by (time, sequence) so kinds never get compared
+_DAY, _OPEN, _CLOSE, _ARRIVAL, _DEPARTURE, _PUBLISH = range(6)
+
+
+def demand_profile(hour: float) -> float:
+    """Relative arrival intensity 0-1 for a fractional hour of the day"""
+    demand = BASELINE_DEMAND
+    for center, height, width in MEAL_PEAKS:
+        demand += height * math.exp(-0.5 * ((hour - center) / width) ** 2)
+    return min(1.0, demand)
+
+
+class StubUplinkServer:
+    """
+    Stand-in for the crowd-level API that only counts what it receives
+
+    Attributes:
+        requests: Total update requests received
+        bytes: Total request body bytes in the configured wire format
+        per_minute: Mapping of simulated minute -> requests in that minute
+    """
+
+    def __init__(self, wire_format: str = "json", clock: Callable[[], float] = time.monotonic):
+        self.wire_format = wire_format
+        self.clock = clock
+        self.requests = 0
+        self.bytes = 0
+        self.per_minute: Dict[int, int] = {}
+        self._body_sizes: Dict[str, int] = {}
+
+    def receive(self, location_id: str, crowd_level: float) -> dict:
+        self.requests += 1
+        # Body size only depends on the id for fixed-width binary; cache it
+        size = self._body_sizes.get(location_id) if self.wire_format == "binary" else None
+        if size is None:
+            body, _ = encode_updates([(location_id, crowd_level, None)], self.wire_format)
+            size = len(body)
+            if self.wire_format == "binary":
+                self._body_sizes[location_id] = size
+        self.bytes += size
+        minute = int(self.clock() // 60)
+        self.per_minute[minute] = self.per_minute.get(minute, 0) + 1
+        return {'success': True, 'locationId': location_id, 'newLevel': crowd_level}
+
+    def get_stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'peak_requests_per_minute': max(self.per_minute.values(), default=0)
+        }
+
+
+class StubSensorClient:
+    """SensorClient look-alike that forwards to a StubUplinkServer"""
+
+    def __init__(self, location_id: str, server: StubUplinkServer):
+        self.location_id = location_id
+        self.server = server
+
+    def send_update(self, crowd_level: float, retry: bool = True) -> dict:
+        return self.server.receive(self.location_id, crowd_level)
+
+
+class _SimLocation:
+    """Ground-truth restaurant plus its door sensors and gateway fusion"""
+
+    __slots__ = ("location_id", "restaurant", "fusion", "doors", "door_seq",
+                 "generation", "peak_rate", "arrivals", "balked", "peak_occupancy")
+
+    def __init__(self, location_id, restaurant, fusion, doors, peak_rate):
+        self.location_id = location_id
+        self.restaurant = restaurant
+        self.fusion = fusion
+        self.doors = doors
+        self.door_seq = [0] * doors
+        # Bumped at closing so departures scheduled before then are ignored
+        self.generation = 0
+        self.peak_rate = peak_rate
+        self.arrivals = 0
+        self.balked = 0
+        self.peak_occupancy = 0
+
+
+class CampusSimulator:
+    """
+    Event-driven simulation of arrivals/departures across many locations
+
+    Attributes:
+        locations: Simulated locations, one per (campus, config entry)
+        server: StubUplinkServer, unless a client_factory was supplied
+        now: Current simulated time in seconds since start
+    """
+
+    def __init__(
+        self,
+        config_file: str = "dining-locations.json",
+        campuses: int = 1,
+        start: Optional[datetime] = None,
+        seed: Optional[int] = None,
+        peak_utilization: float = 0.85,
+        mean_dwell_minutes: float = 25.0,
+        max_party_size: int = 4,
+        people_per_door: int = 150,
+        retransmit_rate: float = 0.01,
+        publish_interval: float = 10.0,
+        wire_format: str = "json",
+        client_factory: Optional[Callable[[str], object]] = None
+    ):
+        """
+        Build the simulated campus
+
+        Args:
+            config_file: dining-locations.json path
+            campuses: Number of copies of the location set to simulate
+            start: Simulation start; rounded down to midnight (default today)
+            seed: Random seed for reproducible runs
+            peak_utilization: Target occupancy fraction at the busiest meal
+            mean_dwell_minutes: Average time a party stays
+            max_party_size: Parties are uniformly 1..max_party_size people
+            people_per_door: Capacity served by each door sensor
+            retransmit_rate: Probability a sensor report is sent twice
+            publish_interval: Gateway publish interval in simulated seconds
+            wire_format: Uplink encoding counted by the stub server
+            client_factory: Optional location_id -> client with send_update();
+                e.g. SensorClient to hit a real endpoint instead of the stub
+        """
+        self.rng = random.Random(seed)
+        start = start or datetime.now()
+        self.start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.now = 0.0
+        self.mean_dwell = mean_dwell_minutes * 60
+        self.max_party_size = max_party_size
+        self.retransmit_rate = retransmit_rate
+        self.publish_interval = publish_interval
+
+        self.server = None
+        if client_factory is None:
+            self.server = StubUplinkServer(wire_format, clock=self._clock)
+            client_factory = lambda location_id: StubSensorClient(location_id, self.server)
+
+        manager = RestaurantManager(config_file)
+        mean_party = (1 + max_party_size) / 2
+        self.locations: List[_SimLocation] = []
+        for campus in range(campuses):
+            for config in manager.config:
+                try:
+                    restaurant = ConfiguredRestaurant(config)
+                except Exception:
+                    continue
+                location_id = manager.make_restaurant_id(restaurant.name)
+                if campuses > 1:
+                    location_id = f"{location_id}@campus-{campus + 1}"
+                restaurant.max_capacity = max(1, int(restaurant.max_capacity))
+
+                fusion = FusionAggregator(
+                    location_id,
+                    restaurant.max_capacity,
+                    client=client_factory(location_id),
+                    publish_interval=publish_interval,
+                    clock=self._clock
+                )
+                doors = 1 + restaurant.max_capacity // people_per_door
+                # Little's law: arrivals/s that hold peak_utilization of capacity
+                peak_rate = peak_utilization * restaurant.max_capacity / (mean_party * self.mean_dwell)
+                self.locations.append(_SimLocation(location_id, restaurant, fusion, doors, peak_rate))
+
+        self.events_processed = 0
+        self._queue = []
+        self._seq = 0
+        # Locations whose fused level may still need publishing
+        self._dirty = set()
+
+    def _clock(self) -> float:
+        return self.now
+
+    def _schedule(self, at: float, kind: int, index: int = -1, payload=None):
+        self._seq += 1
+        heapq.heappush(self._queue, (at, self._seq, kind, index, payload))
+
+    def _emit(self, location: _SimLocation, entries: int = 0, exits: int = 0):
+        """Report a door crossing to the gateway, occasionally retransmitted"""
+        door = self.rng.randrange(location.doors)
+        location.door_seq[door] += 1
+        seq = location.door_seq[door]
+        sensor_id = f"door-{door}"
+        location.fusion.ingest(sensor_id, seq, entries, exits)
+        if self.rng.random() < self.retransmit_rate:
+            location.fusion.ingest(sensor_id, seq, entries, exits)
+        self._dirty.add(location)
+
+    # -- event handlers ---------------------------------------------------
+
+    def _on_day(self, day_start: float):
+        """Schedule today's opening and closing for every location"""
+        day = (self.start + timedelta(seconds=day_start)).strftime("%A").lower()
+        for index, location in enumerate(self.locations):
+            open_hours = location.restaurant.get_open_hours(day)
+            if open_hours is None:
+                continue
+            open_time, close_time = open_hours
+            opens = day_start + open_time.hour * 3600 + open_time.minute * 60
+            closes = day_start + close_time.hour * 3600 + close_time.minute * 60
+            # Same-day window only, matching ConfiguredRestaurant.should_be_open_at
+            if closes > opens:
+                self._schedule(opens, _OPEN, index)
+                self._schedule(closes, _CLOSE, index)
+        self._schedule(day_start + SECONDS_PER_DAY, _DAY)
+
+    def _next_arrival(self, index: int, location: _SimLocation):
+        gap = self.rng.expovariate(location.peak_rate)
+        self._schedule(self.now + gap, _ARRIVAL, index, location.generation)
+
+    def _on_open(self, index: int, location: _SimLocation):
+        # State is set directly; Restaurant's own methods print per call,
+        # which would dominate a run with millions of events
+        location.restaurant.is_open = True
+        self._next_arrival(index, location)
+
+    def _on_close(self, location: _SimLocation):
+        restaurant = location.restaurant
+        if restaurant.current_customers:
+            self._emit(location, exits=restaurant.current_customers)
+            restaurant.exit_count += restaurant.current_customers
+        restaurant.is_open = False
+        restaurant.current_customers = 0
+        location.generation += 1
+
+    def _on_arrival(self, index: int, location: _SimLocation, generation: int):
+        restaurant = location.restaurant
+        if generation != location.generation or not restaurant.is_open:
+            return
+        self._next_arrival(index, location)
+
+        # Thinning: candidate arrivals come at the peak rate and are kept in
+        # proportion to the time-of-day demand
+        hour = (self.now % SECONDS_PER_DAY) / 3600
+        if self.rng.random() >= demand_profile(hour):
+            return
+
+        party = self.rng.randint(1, self.max_party_size)
+        location.arrivals += 1
+        if restaurant.current_customers + party > restaurant.max_capacity:
+            location.balked += 1
+            return
+
+        restaurant.current_customers += party
+        restaurant.entry_count += party
+        if restaurant.current_customers > location.peak_occupancy:
+            location.peak_occupancy = restaurant.current_customers
+        self._emit(location, entries=party)
+
+        dwell = self.rng.lognormvariate(math.log(self.mean_dwell) - 0.125, 0.5)
+        self._schedule(self.now + dwell, _DEPARTURE, index, (generation, party))
+
+    def _on_departure(self, location: _SimLocation, payload):
+        generation, party = payload
+        if generation != location.generation:
+            return
+        restaurant = location.restaurant
+        restaurant.current_customers -= party
+        restaurant.exit_count += party
+        self._emit(location, exits=party)
+
+    def _on_publish(self):
+        # Only visit locations with new sensor data since their last publish
+        still_dirty = set()
+        for location in self._dirty:
+            fusion = location.fusion
+            fusion.maybe_publish()
+            if abs(fusion.crowd_level() - fusion.last_published_level) >= fusion.min_change:
+                still_dirty.add(location)
+        self._dirty = still_dirty
+        self._schedule(self.now + self.publish_interval, _PUBLISH)
+
+    # -- driver -----------------------------------------------------------
+
+    def run(self, days: float = 1.0) -> dict:
+        """
+        Simulate the given number of days and return a summary report
+
+        Returns:
+            Dictionary with event counts, speedup, per-location load and
+            uplink request/byte totals
+        """
+        until = self.now + days * SECONDS_PER_DAY
+        if not self._queue:
+            self._schedule(self.now, _DAY)
+            self._schedule(self.now, _PUBLISH)
+
+        locations = self.locations
+        queue = self._queue
+        wall_start = time.perf_counter()
+        sim_start = self.now
+
+        while queue and queue[0][0] < until:
+            at, _, kind, index, payload = heapq.heappop(queue)
+            self.now = at
+            self.events_processed += 1
+            if kind == _ARRIVAL:
+                self._on_arrival(index, locations[index], payload)
+            elif kind == _DEPARTURE:
+                self._on_departure(locations[index], payload)
+            elif kind == _PUBLISH:
+                self._on_publish()
+            elif kind == _OPEN:
+                self._on_open(index, locations[index])
+            elif kind == _CLOSE:
+                self._on_close(locations[index])
+            elif kind == _DAY:
+                self._on_day(at)
+
+        self.now = until
+        wall = time.perf_counter() - wall_start
+        return self.get_report(until - sim_start, wall)
+
+    def get_report(self, simulated_seconds: float = 0.0, wall_seconds: float = 0.0) -> dict:
+        arrivals = sum(location.arrivals for location in self.locations)
+        balked = sum(location.balked for location in self.locations)
+        busiest = sorted(
+            self.locations,
+            key=lambda location: location.peak_occupancy / location.restaurant.max_capacity,
+            reverse=True
+        )[:5]
+        duplicates = sum(
+            stream['duplicates']
+            for location in self.locations
+            for stream in location.fusion.get_status()['sensors'].values()
+        )
+
+        report = {
+            'locations': len(self.locations),
+            'events': self.events_processed,
+            'simulated_seconds': simulated_seconds,
+            'wall_seconds': wall_seconds,
+            'speedup': simulated_seconds / wall_seconds if wall_seconds else None,
+            'arrivals': arrivals,
+            'balked': balked,
+            'duplicates_dropped': duplicates,
+            'busiest': [
+                {
+                    'location_id': location.location_id,
+                    'peak_occupancy': location.peak_occupancy,
+                    'max_capacity': location.restaurant.max_capacity
+                }
+                for location in busiest
+            ],
+            'uplink': {
+                'publishes': sum(location.fusion.publish_count for location in self.locations)
+            }
+        }
+        if self.server is not None:
+            report['uplink'].update(self.server.get_stats())
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event dining load simulator")
+    parser.add_argument("config", nargs="?", default="dining-locations.json")
+    parser.add_argument("--campuses", type=int, default=1)
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--publish-interval", type=float, default=10.0)
+    parser.add_argument("--wire-format", choices=("json", "binary"), default="json")
+    args = parser.parse_args()
+
+    print("🏫 Campus Load Simulation")
+    print("=" * 50)
+    sim = CampusSimulator(
+        args.config,
+        campuses=args.campuses,
+        seed=args.seed,
+        publish_interval=args.publish_interval,
+        wire_format=args.wire_format
+    )
+    print(f"Simulating {len(sim.locations)} locations for {args.days:g} day(s)...")
+    report = sim.run(days=args.days)
+
+    print(f"\n⏱️  {report['events']:,} events in {report['wall_seconds']:.1f}s "
+          f"({report['speedup']:,.0f}x real time)")
+    print(f"👥 {report['arrivals']:,} parties arrived, {report['balked']:,} turned away at capacity")
+    print(f"🔁 {report['duplicates_dropped']:,} sensor retransmits deduplicated")
+
+    uplink = report['uplink']
+    print(f"\n📡 Uplink ({args.wire_format})")
+    print(f"   Requests: {uplink['requests']:,}")
+    print(f"   Peak requests/minute: {uplink['peak_requests_per_minute']:,}")
+    print(f"   Body bytes: {uplink['bytes']:,}")
+
+    print("\n🔥 Busiest locations (peak occupancy)")
+    for entry in report['busiest']:
+        print(f"   • {entry['location_id']}: {entry['peak_occupancy']}/{entry['max_capacity']}")
+
+
+if __name__ == "__main__":
+    main()
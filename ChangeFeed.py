@@ -0,0 +1,187 @@
+"""
+Versioned change feed of per-restaurant status deltas
+
+Every time a restaurant's status dict actually changes, the feed bumps a
+monotonically increasing version and appends (version, restaurant_id,
+status) to a bounded log. Consumers ask for changes_since(version) or
+subscribe for pushes, and only receive what changed. A consumer that has
+fallen out of the log window gets a full snapshot instead.
+
+Usage:
+    from ChangeFeed import ChangeFeed
+
+    feed = ChangeFeed(max_log=1000)
+    feed.record("caf_libro", {"current_customers": 12, "is_open": True})
+
+    result = feed.changes_since(0)
+    # {"version": 1, "snapshot": False, "changes": [...]}
+
+    unsubscribe = feed.subscribe(lambda change: print(change))
+
+    async for batch in feed.stream(since=result["version"]):
+        ...
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class ChangeFeed:
+    """
+    Bounded, versioned log of restaurant status changes
+
+    Attributes:
+        version: Version of the most recent change (0 before any change)
+        max_log: Number of changes retained for changes_since()
+        subscriber_errors: Number of times a subscriber callback raised
+        last_subscriber_error: Description of the most recent such failure
+    """
+
+    def __init__(self, max_log: int = 1000):
+        if max_log <= 0:
+            raise ValueError(f"max_log must be positive, got {max_log}")
+        self.max_log = max_log
+        self.version = 0
+        self._log = deque(maxlen=max_log)
+        self._latest: Dict[str, dict] = {}
+        self._subscribers: List[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self.subscriber_errors = 0
+        self.last_subscriber_error: Optional[str] = None
+
+    def record(self, restaurant_id: str, status: Optional[dict]) -> Optional[dict]:
+        """
+        Record a restaurant's current status; only logs if it changed
+
+        Args:
+            restaurant_id: Restaurant key
+            status: Current status dict, or None if the restaurant was removed
+
+        Returns:
+            The logged change dict, or None if nothing changed
+        """
+        with self._lock:
+            previous = self._latest.get(restaurant_id)
+            if status == previous:
+                return None
+            if status is None:
+                del self._latest[restaurant_id]
+            else:
+                status = dict(status)
+                self._latest[restaurant_id] = status
+
+            self.version += 1
+            change = {
+                'version': self.version,
+                'restaurant_id': restaurant_id,
+                'status': status
+            }
+            self._log.append(change)
+            subscribers = list(self._subscribers)
+
+        # Call subscribers outside the lock so they may query the feed
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                self._report_subscriber_error(change, e)
+        return change
+
+    def _report_subscriber_error(self, change: dict, error: Exception):
+        """Count a failed callback; warn unless it repeats the previous failure"""
+        message = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.subscriber_errors += 1
+            repeated = message == self.last_subscriber_error
+            self.last_subscriber_error = message
+        if not repeated:
+            print(f"Warning: change feed subscriber failed at version {change['version']} "
+                  f"({change['restaurant_id']}): {message}")
+
+    def snapshot(self) -> dict:
+        """Full current state of every restaurant at the current version"""
+        with self._lock:
+            return {
+                'version': self.version,
+                'snapshot': True,
+                'statuses': {key: dict(value) for key, value in self._latest.items()}
+            }
+
+    def changes_since(self, version: int) -> dict:
+        """
+        Changes after the given version
+
+        Returns:
+            {"version", "snapshot": False, "changes": [...]} when the log still
+            covers the request, otherwise a full snapshot() with snapshot=True.
+            Only the newest change per restaurant is returned.
+        """
+        with self._lock:
+            oldest = self._log[0]['version'] if self._log else self.version + 1
+            if version < oldest - 1 or version > self.version:
+                covered = False
+            else:
+                covered = True
+                latest_per_restaurant = {}
+                for change in self._log:
+                    if change['version'] > version:
+                        latest_per_restaurant[change['restaurant_id']] = change
+                changes = sorted(latest_per_restaurant.values(), key=lambda c: c['version'])
+                current = self.version
+
+        if not covered:
+            return self.snapshot()
+        return {'version': current, 'snapshot': False, 'changes': changes}
+
+    def subscribe(self, callback: Callable[[dict], None]) -> Callable[[], None]:
+        """
+        Push each change to callback as it is recorded
+
+        Callbacks run on the recording thread, which may be any thread that
+        records a change, and must not block. Exceptions they raise are
+        counted in subscriber_errors and printed, not propagated.
+
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    async def stream(self, since: Optional[int] = None):
+        """
+        Async iterator of changes_since() batches
+
+        Yields a snapshot first when since is None or has fallen out of the
+        log, then one delta batch per wake-up. Changes recorded from other
+        threads are picked up via the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def notify(change):
+            loop.call_soon_threadsafe(wake.set)
+
+        unsubscribe = self.subscribe(notify)
+        try:
+            if since is None:
+                batch = self.snapshot()
+                since = batch['version']
+                yield batch
+            while True:
+                wake.clear()
+                batch = self.changes_since(since)
+                if batch['snapshot'] or batch['changes']:
+                    since = batch['version']
+                    yield batch
+                else:
+                    await wake.wait()
+        finally:
+            unsubscribe()
@@ -0,0 +1,320 @@
+"""
+Inverted index for menu and cuisine search across dining locations
+
+Tokenizes each location's name, building, officialMenu, liveMenu, cuisine
+and detailedMenu once at load time. Searches then intersect posting sets
+instead of string-matching every menu item of every location, and a trie
+over the vocabulary answers prefix (typeahead) lookups.
+
+Usage:
+    from MenuIndex import MenuIndex
+
+    index = MenuIndex()
+    index.add_location("caf_libro", location_data)
+    index.search("iced cof")            # last word matched as a prefix
+    index.complete("piz")               # ["pizza", ...]
+    index.update_field("caf_libro", "liveMenu", [{"item": "Pumpkin latte"}])
+
+    state = index.export_state()        # plain data, e.g. for a JSON snapshot
+    MenuIndex().load_state(state)       # rebuilds without re-tokenizing
+"""
+
+import html
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+INDEXED_FIELDS = ("name", "building", "officialMenu", "liveMenu", "cuisine", "detailedMenu")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, decode HTML entities (e.g. &nbsp;) and strip accents"""
+    if text.isascii() and "&" not in text:
+        # Nothing to decode or strip; the common case for menus
+        return text.lower()
+    text = html.unescape(text).replace("\xa0", " ")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized alphanumeric tokens"""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def _field_strings(value) -> Iterable[str]:
+    """Yield every string inside a config field (lists, liveMenu dicts, nested menus)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        if "item" in value:
+            # liveMenu entry: only the item text is searchable
+            yield from _field_strings(value["item"])
+            return
+        for key, nested in value.items():
+            yield key
+            yield from _field_strings(nested)
+    elif isinstance(value, (list, tuple)):
+        for nested in value:
+            yield from _field_strings(nested)
+
+
+def location_field_tokens(data: dict) -> Dict[str, Set[str]]:
+    """Tokens of each non-empty indexed field of a location's config"""
+    fields = {}
+    for field in INDEXED_FIELDS:
+        tokens = set()
+        for text in _field_strings(data.get(field)):
+            tokens.update(tokenize(text))
+        if tokens:
+            fields[field] = tokens
+    return fields
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal = False
+
+
+class MenuIndex:
+    """
+    Token -> location id posting sets with incremental per-field updates
+
+    Attributes:
+        postings: Mapping of token -> set of location ids containing it
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        # location id -> field -> tokens, so a field can be diffed on update
+        # (lists rather than sets for locations restored by load_state)
+        self._field_tokens: Dict[str, Dict[str, Iterable[str]]] = {}
+        self._trie = _TrieNode()
+
+    def __len__(self) -> int:
+        return len(self._field_tokens)
+
+    def __contains__(self, location_id: str) -> bool:
+        return location_id in self._field_tokens
+
+    # -- trie -------------------------------------------------------------
+
+    def _trie_add(self, token: str):
+        node = self._trie
+        for ch in token:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.terminal = True
+
+    def _trie_remove(self, token: str):
+        path = [self._trie]
+        for ch in token:
+            node = path[-1].children.get(ch)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].terminal = False
+        # Prune now-empty branches back toward the root
+        for depth in range(len(token), 0, -1):
+            node = path[depth]
+            if node.terminal or node.children:
+                break
+            del path[depth - 1].children[token[depth - 1]]
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Vocabulary tokens starting with prefix, in sorted order"""
+        tokens = tokenize(prefix)
+        if len(tokens) != 1:
+            return []
+        prefix = tokens[0]
+        node = self._trie
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        results = []
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.terminal:
+                results.append(word)
+                if limit is not None and len(results) >= limit:
+                    break
+            # Push in reverse so pops come out alphabetically
+            for ch in sorted(node.children, reverse=True):
+                stack.append((node.children[ch], word + ch))
+        return results
+
+    # -- postings ---------------------------------------------------------
+
+    def _add_tokens(self, location_id: str, tokens: Iterable[str]):
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = set()
+                self._trie_add(token)
+            posting.add(location_id)
+
+    def _discard_tokens(self, location_id: str, tokens: Iterable[str]):
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(location_id)
+            if not posting:
+                del self.postings[token]
+                self._trie_remove(token)
+
+    def _location_tokens(self, location_id: str) -> Set[str]:
+        tokens = set()
+        for field_tokens in self._field_tokens.get(location_id, {}).values():
+            tokens.update(field_tokens)
+        return tokens
+
+    def add_location(self, location_id: str, data: dict):
+        """Index (or re-index) every searchable field of a location"""
+        self.remove_location(location_id)
+        self._field_tokens[location_id] = location_field_tokens(data)
+        self._add_tokens(location_id, self._location_tokens(location_id))
+
+    def remove_location(self, location_id: str) -> bool:
+        """Drop a location from the index; returns False if it was not indexed"""
+        if location_id not in self._field_tokens:
+            return False
+        self._discard_tokens(location_id, self._location_tokens(location_id))
+        del self._field_tokens[location_id]
+        return True
+
+    def update_field(self, location_id: str, field: str, value):
+        """
+        Re-index one field of one location (e.g. a new liveMenu) in place
+
+        Only tokens that appear or disappear for this location touch the
+        postings, so the rest of the index is left alone.
+        """
+        fields = self._field_tokens.setdefault(location_id, {})
+        before = self._location_tokens(location_id)
+
+        new_tokens = set()
+        for text in _field_strings(value):
+            new_tokens.update(tokenize(text))
+        if new_tokens:
+            fields[field] = new_tokens
+        else:
+            fields.pop(field, None)
+
+        after = self._location_tokens(location_id)
+        self._discard_tokens(location_id, before - after)
+        self._add_tokens(location_id, after - before)
+
+    # -- snapshots --------------------------------------------------------
+
+    def export_state(self, overrides: Optional[Dict[str, dict]] = None) -> dict:
+        """
+        Index contents as plain JSON-serializable data for load_state()
+
+        Args:
+            overrides: Optional location id -> config to export instead of
+                that location's current tokens (e.g. to drop live edits)
+
+        Postings refer to locations by position in "locations" to keep the
+        snapshot small and quick to load.
+        """
+        fields_by_location = self._field_tokens
+        postings = self.postings
+        if overrides:
+            fields_by_location = dict(fields_by_location)
+            postings = dict(postings)
+            for location_id, data in overrides.items():
+                if location_id not in fields_by_location:
+                    continue
+                before = self._location_tokens(location_id)
+                fields_by_location[location_id] = location_field_tokens(data)
+                after = set().union(*fields_by_location[location_id].values())
+                for token in before - after:
+                    postings[token] = postings[token] - {location_id}
+                for token in after - before:
+                    postings[token] = postings.get(token, set()) | {location_id}
+
+        locations = list(fields_by_location)
+        position = {location_id: i for i, location_id in enumerate(locations)}
+        return {
+            'locations': locations,
+            'fields': {
+                location_id: {field: list(tokens) for field, tokens in fields.items()}
+                for location_id, fields in fields_by_location.items()
+            },
+            'postings': {
+                token: [position[location_id] for location_id in posting]
+                for token, posting in postings.items() if posting
+            }
+        }
+
+    def load_state(self, state: dict):
+        """
+        Replace the index contents with an export_state() result, without
+        tokenizing anything. Takes ownership of state["fields"].
+        """
+        locations = state['locations']
+        self._field_tokens = state['fields']
+        self.postings = {
+            token: set(map(locations.__getitem__, positions))
+            for token, positions in state['postings'].items()
+        }
+        self._trie = _TrieNode()
+        for token in self.postings:
+            self._trie_add(token)
+
+    # -- queries ----------------------------------------------------------
+
+    def _prefix_ids(self, prefix: str) -> Set[str]:
+        ids = set()
+        for token in self.complete(prefix):
+            ids |= self.postings[token]
+        return ids
+
+    def search(
+        self,
+        query: str,
+        restrict_to: Optional[Set[str]] = None,
+        prefix: bool = True
+    ) -> Set[str]:
+        """
+        Location ids whose indexed text contains every word in query
+
+        Args:
+            query: Free text, e.g. "chicken sand"
+            restrict_to: Optional set of ids to intersect with (e.g. open now)
+            prefix: Treat the final word as a prefix, for typeahead
+
+        Returns:
+            Set of matching location ids
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+
+        sets = [self.postings.get(token, set()) for token in tokens[:-1]]
+        if prefix:
+            sets.append(self._prefix_ids(tokens[-1]))
+        else:
+            sets.append(self.postings.get(tokens[-1], set()))
+        if restrict_to is not None:
+            sets.append(restrict_to)
+
+        # Intersect smallest-first so the work is bounded by the rarest term
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            if not result:
+                break
+            result &= other
+        return result
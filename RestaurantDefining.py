@@ -1,54 +1,472 @@
 from RestaurantClass import Restaurant
+from SpatialIndex import SpatialIndex
+from MenuIndex import MenuIndex, INDEXED_FIELDS
+from ChangeFeed import ChangeFeed
+from StreamingLoader import iter_locations, LOAD_FIELDS, JSON_LINES_SUFFIXES
 from datetime import datetime, time, date
+import hashlib
 import json
+import os
 import re
+import threading
+
+# Bump when the compiled snapshot layout or menu tokenization changes
+CONFIG_CACHE_VERSION = 3
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
 
 class RestaurantManager:
-    def __init__(self, config_file="dining-locations.json"):
-        self.config = self.load_config(config_file)
+    def __init__(self, config_file="dining-locations.json", change_log_size=1000, use_cache=False,
+                 streaming=False, fields=LOAD_FIELDS):
+        self.config_file = config_file
+        # Opt-in: keep the tokenized menu index in <config_file>.compiled.json
+        # (written next to the config file) and reuse it while the file's
+        # mtime/size, or failing that its sha256, still match
+        # Streaming builds restaurants record by record and keeps only `fields`
+        self.streaming = streaming
+        self.fields = fields
+        # Menu fields a narrower `fields` leaves out of the menu index
+        self._unindexed_fields = [field for field in INDEXED_FIELDS
+                                  if streaming and fields is not None and field not in fields]
+        self._stream_failed = False
+        self.use_cache = use_cache and not streaming
+        self.load_errors = []
+        # (mtime_ns, size) of the loaded config file
+        self._cache_key = None
+        self._cache_stale = False
+        # Raw bytes of the loaded config, kept only until startup or a reload
+        # finishes, so the sha256 is computed only if the snapshot needs it
+        self._config_raw = None
+        self._config_sha256 = None
+        self.config = [] if streaming else self.load_config(config_file)
         self.restaurants = {}
-        self.initialize_restaurants()
+        self._restaurant_configs = {}
+        self.spatial_index = SpatialIndex()
+        self.menu_index = MenuIndex()
+        self.change_feed = ChangeFeed(change_log_size)
+        self._live_menu_ids = set()
+        # Guards the indexes and publishing against the config watcher thread
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._watch_stop = None
+        if streaming:
+            self.initialize_streaming()
+        else:
+            self.initialize_restaurants()
+        self.write_config_cache()
+        self._config_raw = None
+        self.publish_changes()
+    
+    def _record_load_error(self, message):
+        self.load_errors.append(message)
+        print(f"Warning: {message}")
+    
+    def _cache_path(self, config_file):
+        return config_file + ".compiled.json"
+    
+    def _config_digest(self):
+        """sha256 of the loaded config file, hashed on first use"""
+        if self._config_sha256 is None and self._config_raw is not None:
+            self._config_sha256 = hashlib.sha256(self._config_raw).hexdigest()
+        return self._config_sha256
+    
+    def _load_index_snapshot(self):
+        """
+        Prebuilt menu index state for the loaded config, or None if missing or
+        stale. The file is only hashed when its mtime/size differ from the
+        snapshot's; a snapshot that still matches by hash is re-stamped.
+        """
+        if not self.use_cache or self._cache_key is None:
+            return None
+        try:
+            with open(self._cache_path(self.config_file), 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('version') != CONFIG_CACHE_VERSION:
+            return None
+        state = snapshot.get('menu_index')
+        if (not isinstance(state, dict) or not isinstance(state.get('locations'), list)
+                or not isinstance(state.get('fields'), dict) or not isinstance(state.get('postings'), dict)):
+            return None
+        if [snapshot.get('mtime_ns'), snapshot.get('size')] == list(self._cache_key):
+            self._config_sha256 = snapshot.get('sha256')
+        elif snapshot.get('sha256') == self._config_digest():
+            self._cache_stale = True
+        else:
+            return None
+        return state
+    
+    def write_config_cache(self):
+        """
+        Save the tokenized menu index next to the config file, keyed by the
+        file's mtime/size and hash, so the next start can skip tokenizing
+        every menu
+        """
+        with self._lock:
+            if not self.use_cache or self._cache_key is None or not self._cache_stale:
+                return False
+            digest = self._config_digest()
+            if digest is None:
+                return False
+            # Describe the file itself, not liveMenu edits made since it loaded
+            state = self.menu_index.export_state(overrides={
+                restaurant_id: self._restaurant_configs[restaurant_id]
+                for restaurant_id in self._live_menu_ids & self._restaurant_configs.keys()
+            })
+            snapshot = {
+                'version': CONFIG_CACHE_VERSION,
+                'mtime_ns': self._cache_key[0],
+                'size': self._cache_key[1],
+                'sha256': digest,
+                'menu_index': state
+            }
+        cache_path = self._cache_path(self.config_file)
+        temp_path = cache_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(snapshot, file, separators=(',', ':'))
+            os.replace(temp_path, cache_path)
+            self._cache_stale = False
+            return True
+        except OSError:
+            return False
     
     def load_config(self, config_file):
+        self._cache_key = None
+        self._config_raw = None
+        self._config_sha256 = None
+        try:
+            stat = os.stat(config_file)
+        except OSError:
+            self._record_load_error(f"Config file not found: {config_file}")
+            return []
+        
         try: 
-            with open(config_file, 'r') as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(config_file, 'rb') as file:
+                raw = file.read()
+            if config_file.lower().endswith(JSON_LINES_SUFFIXES):
+                config = list(iter_locations(config_file, fields=None, on_error=self._record_load_error))
+            else:
+                config = json.loads(raw)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            self._record_load_error(f"Could not parse {config_file}: {e}")
+            return []
+        if not isinstance(config, list):
+            self._record_load_error(f"Expected a JSON array of locations in {config_file}")
             return []
+        
+        self._cache_key = (stat.st_mtime_ns, stat.st_size)
+        if self.use_cache:
+            self._config_raw = raw
+        return config
+    
+    @staticmethod
+    def make_restaurant_id(name):
+        return name.lower().replace(" ", "_").replace("&", "and").replace(",", "").replace("'", "")
+    
+    def _build_restaurant(self, index, restaurant_data):
+        """(restaurant_id, ConfiguredRestaurant) for a config entry, or None if malformed"""
+        try:
+            restaurant_id = self.make_restaurant_id(restaurant_data["name"])
+            restaurant = ConfiguredRestaurant(restaurant_data)
+            restaurant.on_change = self._status_recorder(restaurant_id)
+            return restaurant_id, restaurant
+        except Exception as e:
+            name = restaurant_data.get("name", "?") if isinstance(restaurant_data, dict) else "?"
+            self._record_load_error(f"Skipping location #{index} ({name}): {type(e).__name__}: {e}")
+            return None
+    
+    def _status_recorder(self, restaurant_id):
+        """Change hook that records a restaurant's status while it is current"""
+        def record(restaurant):
+            # Ignore objects replaced by a reload (or not swapped in yet)
+            if self.restaurants.get(restaurant_id) is restaurant:
+                self.change_feed.record(restaurant_id, restaurant.get_status())
+        return record
+    
+    def _index_restaurant(self, restaurant_id, restaurant, restaurant_data, index_menu=True):
+        self.spatial_index.remove(restaurant_id)
+        if restaurant.coordinates:
+            self.spatial_index.insert(restaurant_id, *restaurant.coordinates)
+        if index_menu:
+            self.menu_index.add_location(restaurant_id, restaurant_data)
+    
+    def _unindex_restaurant(self, restaurant_id):
+        self.spatial_index.remove(restaurant_id)
+        self.menu_index.remove_location(restaurant_id)
+    
+    def _add_config_entry(self, index, restaurant_data, index_menu=True):
+        built = self._build_restaurant(index, restaurant_data)
+        if built is None:
+            return
+        restaurant_id, restaurant = built
+        self.restaurants[restaurant_id] = restaurant
+        self._restaurant_configs[restaurant_id] = restaurant_data
+        self._index_restaurant(restaurant_id, restaurant, restaurant_data, index_menu)
     
     def initialize_restaurants(self):
         """Initialize restaurants from JSON data"""
-        for restaurant_data in self.config:
+        menu_state = self._load_index_snapshot()
+        for index, restaurant_data in enumerate(self.config):
+            self._add_config_entry(index, restaurant_data, index_menu=menu_state is None)
+        
+        if menu_state is not None and menu_state['fields'].keys() != self._restaurant_configs.keys():
+            # Snapshot disagrees with what was built; index from scratch
+            for restaurant_id, restaurant_data in self._restaurant_configs.items():
+                self.menu_index.add_location(restaurant_id, restaurant_data)
+            menu_state = None
+        if menu_state is not None:
+            self.menu_index.load_state(menu_state)
+        else:
+            self._cache_stale = True
+    
+    def stream_config(self, config_file):
+        """
+        Iterate projected location records without loading the whole file.
+        Sets _stream_failed if the file could not be read to the end (a bad
+        JSON-lines record is only reported and skipped).
+        """
+        self._stream_failed = False
+        try:
+            yield from iter_locations(config_file, self.fields, on_error=self._record_load_error)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            self._stream_failed = True
+            self._record_load_error(f"Could not stream {config_file}: {e}")
+    
+    def initialize_streaming(self):
+        """Build restaurants one record at a time as the config file is parsed"""
+        for index, restaurant_data in enumerate(self.stream_config(self.config_file)):
+            self.config.append(restaurant_data)
+            self._add_config_entry(index, restaurant_data)
+    
+    def reload_config(self):
+        """
+        Re-read the config file and rebuild only locations whose entry changed.
+        Unchanged locations keep their objects (and live occupancy); changed
+        ones carry their live counters over to the rebuilt restaurant.
+        """
+        with self._reload_lock:
+            self.load_errors = []
+            previous_key = self._cache_key
+            if self.streaming:
+                new_config = list(self.stream_config(self.config_file))
+                failed = self._stream_failed
+            else:
+                new_config = self.load_config(self.config_file)
+                failed = bool(self.load_errors) and not new_config
+            if failed:
+                # Keep serving the last good config rather than dropping the
+                # locations a truncated or half-written file is missing
+                return {'added': [], 'removed': [], 'changed': [], 'unchanged': len(self.restaurants),
+                        'errors': list(self.load_errors)}
+            
+            with self._lock:
+                # Later entries with the same id win, as in initialize_restaurants
+                entries = {}
+                for index, restaurant_data in enumerate(new_config):
+                    restaurant_id = None
+                    if isinstance(restaurant_data, dict) and isinstance(restaurant_data.get("name"), str):
+                        restaurant_id = self.make_restaurant_id(restaurant_data["name"])
+                    entries[restaurant_id if restaurant_id is not None else ("#", index)] = (index, restaurant_data)
+                
+                new_restaurants = {}
+                new_configs = {}
+                added, changed = [], []
+                for restaurant_id, (index, restaurant_data) in entries.items():
+                    if restaurant_id in self.restaurants and self._restaurant_configs.get(restaurant_id) == restaurant_data:
+                        new_restaurants[restaurant_id] = self.restaurants[restaurant_id]
+                        new_configs[restaurant_id] = restaurant_data
+                        continue
+                    
+                    built = self._build_restaurant(index, restaurant_data)
+                    if built is None:
+                        continue
+                    restaurant_id, restaurant = built
+                    previous = self.restaurants.get(restaurant_id)
+                    if previous is not None:
+                        restaurant.is_open = previous.is_open
+                        restaurant.current_customers = min(previous.current_customers, restaurant.max_capacity)
+                        restaurant.entry_count = previous.entry_count
+                        restaurant.exit_count = previous.exit_count
+                        changed.append(restaurant_id)
+                    else:
+                        added.append(restaurant_id)
+                    new_restaurants[restaurant_id] = restaurant
+                    new_configs[restaurant_id] = restaurant_data
+                    self._index_restaurant(restaurant_id, restaurant, restaurant_data)
+                
+                removed = [restaurant_id for restaurant_id in self.restaurants if restaurant_id not in new_restaurants]
+                for restaurant_id in removed:
+                    self._unindex_restaurant(restaurant_id)
+                    self.change_feed.record(restaurant_id, None)
+                
+                # Swap whole dicts so readers iterating the old ones are unaffected
+                self.config = new_config
+                self.restaurants = new_restaurants
+                self._restaurant_configs = new_configs
+                if self._cache_key != previous_key:
+                    self._cache_stale = True
+                self.publish_changes()
+            # Written outside the lock; the export inside takes it briefly
+            self.write_config_cache()
+            self._config_raw = None
+            return {
+                'added': added,
+                'removed': removed,
+                'changed': changed,
+                'unchanged': len(new_restaurants) - len(added) - len(changed),
+                'errors': list(self.load_errors)
+            }
+    
+    def watch_config(self, interval=2.0, on_reload=None):
+        """
+        Poll the config file in a background thread and hot-reload on change
+
+        on_reload, if given, is called with each reload_config() summary.
+        Reloads, queries and publishing share the manager lock, so the
+        watcher never changes the indexes under a running query.
+        Returns the watcher thread; call stop_watching() to end it.
+        """
+        self.stop_watching()
+        stop = threading.Event()
+        
+        def file_signature():
             try:
-                name = restaurant_data["name"]
-                restaurant_id = name.lower().replace(" ", "_").replace("&", "and").replace(",", "").replace("'", "")
-                restaurant = ConfiguredRestaurant(restaurant_data)
-                self.restaurants[restaurant_id] = restaurant
-            except Exception:
-                continue
+                stat = os.stat(self.config_file)
+                return (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                return None
+        
+        def watch():
+            # Baseline on the file we actually loaded, so edits made before
+            # the watcher started are still picked up
+            last = self._cache_key or file_signature()
+            while not stop.wait(interval):
+                current = file_signature()
+                if current is None or current == last:
+                    continue
+                last = current
+                try:
+                    summary = self.reload_config()
+                except Exception as e:
+                    self._record_load_error(f"Hot reload failed: {e}")
+                    continue
+                if on_reload is not None:
+                    on_reload(summary)
+        
+        self._watch_stop = stop
+        self._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+    
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watcher.join()
+        self._watcher = None
+        self._watch_stop = None
     
     def get_restaurant(self, restaurant_id):
         return self.restaurants.get(restaurant_id)
     
+    def _location_filter(self, open_only, max_occupancy):
+        """Build a spatial index predicate for open/occupancy filtering"""
+        if not open_only and max_occupancy is None:
+            return None
+        
+        def predicate(restaurant_id):
+            restaurant = self.restaurants.get(restaurant_id)
+            if restaurant is None:
+                return False
+            if open_only and not restaurant.is_open:
+                return False
+            if max_occupancy is not None and restaurant.get_occupancy_rate() >= max_occupancy:
+                return False
+            return True
+        return predicate
+    
+    def find_nearest(self, lat, lng, k=5, open_only=False, max_occupancy=None):
+        """k nearest restaurants to (lat, lng), optionally open and below an occupancy %"""
+        predicate = self._location_filter(open_only, max_occupancy)
+        with self._lock:
+            if open_only and not any(restaurant.is_open for restaurant in self.restaurants.values()):
+                # At night the predicate would reject every point in the index
+                return []
+            nearest = self.spatial_index.nearest(lat, lng, k, predicate)
+        return [(restaurant_id, distance) for distance, restaurant_id in nearest]
+    
+    def find_within_radius(self, lat, lng, radius_m, open_only=False, max_occupancy=None):
+        """All restaurants within radius_m meters of (lat, lng), closest first"""
+        predicate = self._location_filter(open_only, max_occupancy)
+        with self._lock:
+            within = self.spatial_index.within_radius(lat, lng, radius_m, predicate)
+        return [(restaurant_id, distance) for distance, restaurant_id in within]
+    
+    def open_restaurant_ids(self):
+        return {restaurant_id for restaurant_id, restaurant in self.restaurants.items() if restaurant.is_open}
+    
+    def search_menu(self, query, open_only=False):
+        """Restaurant ids whose menu, cuisine, name or building match every word of query"""
+        if self._unindexed_fields:
+            print(f"Warning: menu search skips fields not loaded in streaming mode: "
+                  f"{', '.join(self._unindexed_fields)}")
+            self._unindexed_fields = []  # warn once
+        restrict_to = self.open_restaurant_ids() if open_only else None
+        with self._lock:
+            return self.menu_index.search(query, restrict_to=restrict_to)
+    
+    def update_live_menu(self, restaurant_id, live_menu):
+        """Replace a restaurant's liveMenu and re-index just that field"""
+        with self._lock:
+            restaurant = self.restaurants.get(restaurant_id)
+            if restaurant is None:
+                return False
+            restaurant.live_menu = list(live_menu)
+            self._live_menu_ids.add(restaurant_id)
+            self.menu_index.update_field(restaurant_id, "liveMenu", restaurant.live_menu)
+            return True
+    
+    def publish_changes(self):
+        """
+        Record any restaurant whose status changed since the last publish.
+        Entries, exits and open/close are recorded as they happen; this is
+        only needed after editing restaurant attributes directly.
+        """
+        with self._lock:
+            for restaurant_id, restaurant in self.restaurants.items():
+                self.change_feed.record(restaurant_id, restaurant.get_status())
+            return self.change_feed.version
+    
+    def changes_since(self, version):
+        """Status deltas after version, or a full snapshot if it fell out of the log"""
+        return self.change_feed.changes_since(version)
+    
+    def subscribe(self, callback):
+        """Push each status change to callback; returns an unsubscribe function"""
+        return self.change_feed.subscribe(callback)
+    
     def update_all_restaurants(self):
         """Update open/closed status for all restaurants"""
         results = {}
-        for restaurant_id, restaurant in self.restaurants.items():
-            try:
-                should_be_open = restaurant.auto_update_status()
-                hours_status = restaurant.get_hours_status()  # Get hours info
-                
-                results[restaurant_id] = {
-                    'name': restaurant.name,
-                    'is_open': restaurant.is_open,
-                    'should_be_open': should_be_open,
-                    'current_customers': restaurant.current_customers,
-                    'max_capacity': restaurant.max_capacity,
-                    'building': restaurant.building,
-                    'today_hours': hours_status['today_hours']  # Add hours here
-                }
-            except Exception:
-                continue
+        # Serialized with reloads so the change feed sees one writer at a time
+        with self._lock:
+            for restaurant_id, restaurant in self.restaurants.items():
+                try:
+                    should_be_open = restaurant.auto_update_status()
+                    hours_status = restaurant.get_hours_status()  # Get hours info
+                    
+                    results[restaurant_id] = {
+                        'name': restaurant.name,
+                        'is_open': restaurant.is_open,
+                        'should_be_open': should_be_open,
+                        'current_customers': restaurant.current_customers,
+                        'max_capacity': restaurant.max_capacity,
+                        'building': restaurant.building,
+                        'today_hours': hours_status['today_hours']  # Add hours here
+                    }
+                except Exception:
+                    continue
         return results
     
     def get_all_statuses(self):
@@ -71,11 +489,52 @@ class RestaurantManager:
                 continue
         return statuses
 class ConfiguredRestaurant(Restaurant):
+    # Hours strings repeat heavily across locations (e.g. "Daily"); share the
+    # compiled weekly table between identical schedules
+    _compiled_hours_cache = {}
+    
     def __init__(self, config):
         max_capacity = config.get("crowdLevel", 50)
         super().__init__(config["name"], max_capacity)
         self.building = config.get("building", "Unknown")
         self.hours_data = config.get("hours", [])
+        self.coordinates = self.parse_coordinates(config.get("coordinates"))
+        self.official_menu = config.get("officialMenu", [])
+        self.live_menu = config.get("liveMenu", [])
+        self.cuisine = config.get("cuisine", [])
+        # Called with this restaurant after entries, exits and open/close
+        self.on_change = None
+        # Weekday -> (open_time, close_time) or None, so lookups skip regex parsing
+        self.compiled_hours = self.compile_hours()
+    
+    def _notify_change(self):
+        if self.on_change is not None:
+            self.on_change(self)
+    
+    def customer_enters(self, count=1):
+        result = super().customer_enters(count)
+        self._notify_change()
+        return result
+    
+    def customer_exits(self, count=1):
+        result = super().customer_exits(count)
+        self._notify_change()
+        return result
+    
+    def open_restaurant(self):
+        super().open_restaurant()
+        self._notify_change()
+    
+    def close_restaurant(self):
+        super().close_restaurant()
+        self._notify_change()
+    
+    def parse_coordinates(self, coordinates):
+        """Return (lat, lng) floats from a {"lat", "lng"} dict, or None"""
+        try:
+            return (float(coordinates["lat"]), float(coordinates["lng"]))
+        except (TypeError, KeyError, ValueError):
+            return None
     
     def parse_single_time(self, time_str):
         """Parse time string to time object"""
@@ -152,24 +611,49 @@ class ConfiguredRestaurant(Restaurant):
         
         return current_day in day_range
     
-    def should_be_open_now(self):
-        current_day = self.get_current_day()
-        current_time = datetime.now().time()
-        
+    def compile_hours(self):
+        try:
+            key = tuple((entry.get("day", ""), entry.get("hours", "")) for entry in self.hours_data)
+        except AttributeError:
+            return {day: self.parse_open_hours(day) for day in DAYS}
+        compiled = self._compiled_hours_cache.get(key)
+        if compiled is None:
+            compiled = {day: self.parse_open_hours(day) for day in DAYS}
+            if len(self._compiled_hours_cache) < 10000:
+                self._compiled_hours_cache[key] = compiled
+        return dict(compiled)
+    
+    def get_open_hours(self, day):
+        """(open_time, close_time) for a weekday name, or None if closed/unknown"""
+        if day in self.compiled_hours:
+            return self.compiled_hours[day]
+        return self.parse_open_hours(day)
+    
+    def parse_open_hours(self, day):
         for hours_entry in self.hours_data:
             day_range = hours_entry.get("day", "")
             hours_string = hours_entry.get("hours", "").lower()
             
-            if self.does_day_match(day_range, current_day):
+            if self.does_day_match(day_range, day):
                 if "closed" in hours_string:
-                    return False
+                    return None
                 
                 open_time, close_time = self.parse_hours_range(hours_entry["hours"])
                 
                 if open_time and close_time:
-                    return open_time <= current_time <= close_time
+                    return open_time, close_time
         
-        return False
+        return None
+    
+    def should_be_open_at(self, moment):
+        open_hours = self.get_open_hours(moment.strftime("%A").lower())
+        if open_hours is None:
+            return False
+        open_time, close_time = open_hours
+        return open_time <= moment.time() <= close_time
+    
+    def should_be_open_now(self):
+        return self.should_be_open_at(datetime.now())
     
     def auto_update_status(self):
         should_be_open = self.should_be_open_now()
@@ -231,4 +715,5 @@ def display_restaurant_status():
                 print(f"• {status['name']} - {status.get('today_hours', 'Hours unknown')}")
 
 # Run the clean display
-display_restaurant_status()
\ No newline at end of file
+if __name__ == "__main__":
+    display_restaurant_status()
\ No newline at end of file
@@ -16,11 +16,204 @@ Usage:
     
     # Send crowd level update
     sensor.send_update(45)
+
+    # Compact binary encoding (falls back to JSON on 415 Unsupported Media Type)
+    sensor = SensorClient("kerr-drummond", wire_format="binary")
+    sensor.send_batch([(40, 1730000000), (45, 1730000060)])
+
+Binary wire format (Content-Type: application/x-crowd-level, big-endian):
+    header:   b"CL" | version u8 | location count u8 | record count u16 |
+              base timestamp u32 (unix seconds of the first record, 0 = now)
+    id table: per location: id length u8 | id utf-8
+    record:   [location index u8, only if location count > 1] |
+              crowd level u16 (hundredths of a percent) |
+              timestamp delta varint (zigzag LEB128 seconds since the
+              previous record's timestamp, the first from the base)
+A record timestamp of 0 means "now".
+
+Bodies larger than GZIP_THRESHOLD bytes are gzip-compressed and sent with
+Content-Encoding: gzip. The API key is only sent in the x-api-key header.
 """
 
+import gzip
+import json
+import struct
 import requests
 import time
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
+
+JSON_CONTENT_TYPE = "application/json"
+BINARY_CONTENT_TYPE = "application/x-crowd-level"
+BINARY_MAGIC = b"CL"
+BINARY_VERSION = 2
+GZIP_THRESHOLD = 1024
+
+_HEADER = struct.Struct(">2sBBHI")
+_LEVEL = struct.Struct(">H")
+
+
+def _append_varint(out: bytearray, value: int):
+    """Append a signed int as a zigzag LEB128 varint"""
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(body: bytes, offset: int) -> Tuple[int, int]:
+    """Decode a zigzag LEB128 varint; returns (value, new offset)"""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(body):
+            raise ValueError("Invalid binary body: truncated record")
+        byte = body[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+        if shift > 63:
+            raise ValueError("Invalid binary body: varint too long")
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), offset
+
+
+def encode_updates(updates: Iterable[Tuple[str, float, Optional[int]]], wire_format: str = "json") -> Tuple[bytes, dict]:
+    """
+    Encode (location_id, crowd_level, timestamp) updates into a request body
+
+    Args:
+        updates: Iterable of (location_id, crowd_level, timestamp or None)
+        wire_format: "json" or "binary"
+
+    Returns:
+        (body bytes, headers dict with Content-Type / Content-Encoding)
+
+    Raises:
+        ValueError: If updates is empty or does not fit the wire format
+    """
+    updates = list(updates)
+    if not updates:
+        raise ValueError("updates must not be empty")
+    if wire_format == "binary":
+        if len(updates) > 0xFFFF:
+            raise ValueError(f"binary format holds at most 65535 updates, got {len(updates)}")
+        # Each location id is sent once; records refer to it by index
+        indexes = {}
+        for location_id, _, _ in updates:
+            if location_id not in indexes:
+                indexes[location_id] = len(indexes)
+        if len(indexes) > 0xFF:
+            raise ValueError(f"binary format holds at most 255 locations per batch, got {len(indexes)}")
+        timestamps = [int(timestamp or 0) for _, _, timestamp in updates]
+        base = timestamps[0]
+
+        body = bytearray(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(indexes), len(updates), base))
+        for location_id in indexes:
+            encoded_id = location_id.encode("utf-8")
+            if len(encoded_id) > 255:
+                raise ValueError(f"location_id too long for binary format: {location_id}")
+            body.append(len(encoded_id))
+            body += encoded_id
+
+        with_index = len(indexes) > 1
+        pack = _LEVEL.pack
+        previous = base
+        for (location_id, crowd_level, _), timestamp in zip(updates, timestamps):
+            if with_index:
+                body.append(indexes[location_id])
+            body += pack(round(crowd_level * 100))
+            # Readings are usually seconds apart, so deltas fit in one byte
+            _append_varint(body, timestamp - previous)
+            previous = timestamp
+        body = bytes(body)
+        headers = {"Content-Type": BINARY_CONTENT_TYPE}
+    elif wire_format == "json":
+        records = []
+        for location_id, crowd_level, timestamp in updates:
+            record = {"locationId": location_id, "crowdLevel": float(crowd_level)}
+            if timestamp:
+                record["timestamp"] = int(timestamp)
+            records.append(record)
+        payload = records[0] if len(records) == 1 else {"updates": records}
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        headers = {"Content-Type": JSON_CONTENT_TYPE}
+    else:
+        raise ValueError(f"wire_format must be 'json' or 'binary', got {wire_format!r}")
+
+    if len(body) > GZIP_THRESHOLD:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def decode_updates(body: bytes, content_type: str = JSON_CONTENT_TYPE, content_encoding: Optional[str] = None) -> List[dict]:
+    """
+    Decode a request body produced by encode_updates
+
+    Useful for local stand-ins of the API and for benchmarking.
+
+    Returns:
+        List of {"locationId", "crowdLevel", "timestamp"} dicts
+
+    Raises:
+        ValueError: If the body is malformed
+    """
+    if content_encoding == "gzip":
+        body = gzip.decompress(body)
+
+    if content_type.split(";")[0].strip() == BINARY_CONTENT_TYPE:
+        if len(body) < _HEADER.size:
+            raise ValueError("Invalid binary body: truncated header")
+        magic, version, id_count, count, timestamp = _HEADER.unpack_from(body)
+        if magic != BINARY_MAGIC:
+            raise ValueError("Invalid binary body: bad magic")
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary version: {version}")
+
+        offset = _HEADER.size
+        location_ids = []
+        for _ in range(id_count):
+            if offset >= len(body):
+                raise ValueError("Invalid binary body: truncated id table")
+            end = offset + 1 + body[offset]
+            if end > len(body):
+                raise ValueError("Invalid binary body: truncated id table")
+            location_ids.append(body[offset + 1:end].decode("utf-8"))
+            offset = end
+
+        with_index = id_count > 1
+        updates = []
+        for _ in range(count):
+            index = 0
+            if with_index:
+                if offset >= len(body):
+                    raise ValueError("Invalid binary body: truncated record")
+                index = body[offset]
+                offset += 1
+            if index >= id_count or offset + _LEVEL.size > len(body):
+                raise ValueError("Invalid binary body: truncated record")
+            level, = _LEVEL.unpack_from(body, offset)
+            delta, offset = _read_varint(body, offset + _LEVEL.size)
+            timestamp += delta
+            updates.append({
+                "locationId": location_ids[index],
+                "crowdLevel": level / 100,
+                "timestamp": timestamp or None
+            })
+        return updates
+
+    payload = json.loads(body)
+    records = payload["updates"] if isinstance(payload, dict) and "updates" in payload else [payload]
+    return [
+        {
+            "locationId": record.get("locationId"),
+            "crowdLevel": record.get("crowdLevel"),
+            "timestamp": record.get("timestamp")
+        }
+        for record in records
+    ]
 
 
 class SensorClient:
@@ -32,6 +225,8 @@ class SensorClient:
         project_id: Firebase project ID
         api_key: Optional API key for authentication
         base_url: Base URL for the Firebase Functions endpoint
+        wire_format: "json" or "binary"; drops back to "json" if the
+            server answers a binary body with 415 Unsupported Media Type
     """
     
     def __init__(
@@ -39,7 +234,8 @@ class SensorClient:
         location_id: str,
         project_id: str = "hackokstate25",
         api_key: Optional[str] = None,
-        region: str = "us-central1"
+        region: str = "us-central1",
+        wire_format: str = "json"
     ):
         """
         Initialize sensor client for a specific location
@@ -49,11 +245,15 @@ class SensorClient:
             project_id: Firebase project ID
             api_key: Optional API key for authentication
             region: Firebase Functions region
+            wire_format: "json" (default) or "binary" for the compact encoding
         """
+        if wire_format not in ("json", "binary"):
+            raise ValueError(f"wire_format must be 'json' or 'binary', got {wire_format!r}")
         self.location_id = location_id
         self.project_id = project_id
         self.api_key = api_key
         self.base_url = f"https://hackokstate25.web.app"
+        self.wire_format = wire_format
     
     def send_update(self, crowd_level: float, retry: bool = True) -> dict:
         """
@@ -76,36 +276,54 @@ class SensorClient:
             >>> print(result['message'])
             'Crowd level updated successfully'
         """
-        # Validate crowd level
+        self._validate_level(crowd_level)
+        return self._post([(self.location_id, crowd_level, None)], retry)
+    
+    def send_batch(self, readings: Iterable[Tuple[float, Optional[int]]], retry: bool = True) -> dict:
+        """
+        Send several readings for this location in one request (e.g. replays)
+        
+        Args:
+            readings: Iterable of (crowd_level, unix timestamp or None)
+            retry: Whether to retry once on failure (default: True)
+        
+        Returns:
+            Response dictionary with success status
+        """
+        updates = []
+        for crowd_level, timestamp in readings:
+            self._validate_level(crowd_level)
+            updates.append((self.location_id, crowd_level, timestamp))
+        if not updates:
+            raise ValueError("readings must not be empty")
+        return self._post(updates, retry)
+    
+    def _validate_level(self, crowd_level):
         if not isinstance(crowd_level, (int, float)):
             raise ValueError(f"crowd_level must be a number, got {type(crowd_level)}")
         
         if crowd_level < 0 or crowd_level > 100:
             raise ValueError(f"crowd_level must be between 0 and 100, got {crowd_level}")
-        
-        # Prepare request
+    
+    def _post(self, updates, retry):
         url = f"{self.base_url}/api/update-crowd-level"
+        body, headers = encode_updates(updates, self.wire_format)
         
-        payload = {
-            "locationId": self.location_id,
-            "crowdLevel": float(crowd_level)
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        # Add API key if provided
+        # API key travels in the header only
         if self.api_key:
             headers["x-api-key"] = self.api_key
-            payload["apiKey"] = self.api_key
         
         # Make request with optional retry
         max_attempts = 2 if retry else 1
         
         for attempt in range(max_attempts):
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=10)
+                response = requests.post(url, data=body, headers=headers, timeout=10)
+                if self.wire_format == "binary" and response.status_code == 415:
+                    # Server doesn't support this binary Content-Type/version; use JSON
+                    # from now on. Other 4xx (e.g. a malformed body) are real errors.
+                    self.wire_format = "json"
+                    return self._post(updates, retry)
                 response.raise_for_status()
                 return response.json()
                 
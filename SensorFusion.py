@@ -0,0 +1,251 @@
+"""
+Multi-sensor fusion for a single dining location
+
+Big halls have several doors, each with its own sensor. Rather than every
+sensor overwriting crowdLevel with its own partial view, each door reports
+entry/exit deltas tagged with a per-sensor sequence number (and a boot
+counter, so a restarted sensor can start its sequence over) to one
+FusionAggregator. The aggregator puts each sensor's deltas back in order,
+drops retransmits, keeps one authoritative Restaurant occupancy and
+publishes a single fused crowd level at a controlled rate.
+
+Usage:
+    from SensorClient import SensorClient
+    from SensorFusion import FusionAggregator
+
+    fusion = FusionAggregator(
+        location_id="kerr-drummond",
+        max_capacity=400,
+        client=SensorClient("kerr-drummond"),
+        publish_interval=10.0
+    )
+
+    fusion.ingest("north-door", seq=41, entries=2)
+    fusion.ingest("south-door", seq=7, exits=1)
+    fusion.ingest("north-door", seq=1, entries=1, epoch=1)   # after a reboot
+    fusion.maybe_publish()
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from RestaurantClass import Restaurant
+
+# Sequence number a sensor sends first after booting
+FIRST_SEQ = 1
+
+
+class _SensorStream:
+    """Reordering state for one sensor's sequence numbers"""
+
+    __slots__ = ("epoch", "next_seq", "pending", "applied", "duplicates", "lost", "gap_since")
+
+    def __init__(self, epoch: int, first_seq: int):
+        self.epoch = epoch
+        self.next_seq = first_seq
+        self.pending: Dict[int, tuple] = {}
+        self.applied = 0
+        self.duplicates = 0
+        self.lost = 0
+        # Clock time since which next_seq has been missing with later reports buffered
+        self.gap_since: Optional[float] = None
+
+    def restart(self, epoch: int, seq: int):
+        """Start over after a sensor reboot, keeping the cumulative counters"""
+        # Buffered deltas from the previous boot can no longer be ordered
+        self.lost += len(self.pending)
+        self.pending.clear()
+        self.gap_since = None
+        self.epoch = epoch
+        # A rebooted sensor counts from FIRST_SEQ; earlier reports may still
+        # be in flight behind this one
+        self.next_seq = min(seq, FIRST_SEQ)
+
+
+class FusionAggregator:
+    """
+    Orders, dedupes and fuses entry/exit deltas from many sensors
+
+    Attributes:
+        location_id: Firestore document ID for the fused location
+        restaurant: Authoritative Restaurant holding the fused occupancy
+        client: Optional SensorClient used to publish the fused crowd level
+        publish_interval: Minimum seconds between published updates
+        reorder_window: Out-of-order deltas buffered per sensor before a
+            missing sequence number is treated as lost
+        gap_timeout: Seconds a missing sequence number is waited for before
+            it is treated as lost, however few deltas are buffered
+    """
+
+    def __init__(
+        self,
+        location_id: str,
+        max_capacity: int,
+        client=None,
+        publish_interval: float = 5.0,
+        reorder_window: int = 32,
+        gap_timeout: float = 30.0,
+        min_change: float = 0.5,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the aggregator for one location
+
+        Args:
+            location_id: Firestore document ID (e.g., "kerr-drummond")
+            max_capacity: Capacity of the whole location, across all doors
+            client: Optional SensorClient; anything with send_update(level)
+            publish_interval: Minimum seconds between published updates
+            reorder_window: Max buffered out-of-order deltas per sensor
+            gap_timeout: Max seconds to wait for a missing delta
+            min_change: Skip publishing when the level moved less than this
+            clock: Time source, injectable for simulation
+        """
+        self.location_id = location_id
+        self.restaurant = Restaurant(location_id, max_capacity)
+        self.restaurant.is_open = True
+        self.client = client
+        self.publish_interval = publish_interval
+        self.reorder_window = reorder_window
+        self.gap_timeout = gap_timeout
+        self.min_change = min_change
+        self.clock = clock
+        self.sensors: Dict[str, _SensorStream] = {}
+        self.last_published_level: Optional[float] = None
+        self.last_publish_time: Optional[float] = None
+        self.publish_count = 0
+        self._lock = threading.Lock()
+
+    def ingest(self, sensor_id: str, seq: int, entries: int = 0, exits: int = 0, epoch: int = 0) -> bool:
+        """
+        Accept one delta report from a sensor
+
+        Args:
+            sensor_id: Identifier of the door sensor
+            seq: Per-sensor sequence number, incremented once per report
+            entries: People counted entering since the previous report
+            exits: People counted exiting since the previous report
+            epoch: Sensor boot counter, increased on every restart; a higher
+                epoch restarts the sequence, a lower one is a stale report
+
+        Returns:
+            False if the report was a duplicate/retransmit or stale, True otherwise
+
+        Raises:
+            ValueError: If entries or exits is negative
+        """
+        if entries < 0 or exits < 0:
+            raise ValueError(f"entries and exits must be non-negative, got {entries}/{exits}")
+
+        with self._lock:
+            stream = self.sensors.get(sensor_id)
+            if stream is None:
+                # First contact may be mid-life, so start at whatever arrived
+                stream = self.sensors[sensor_id] = _SensorStream(epoch, seq)
+            elif epoch > stream.epoch:
+                stream.restart(epoch, seq)
+
+            if epoch < stream.epoch or seq < stream.next_seq or seq in stream.pending:
+                stream.duplicates += 1
+                return False
+
+            stream.pending[seq] = (entries, exits)
+            self._drain(stream, self.clock())
+            return True
+
+    def _drain(self, stream: _SensorStream, now: float):
+        """Apply every in-order delta, skipping a gap once the window overflows or it times out"""
+        while stream.pending:
+            if stream.next_seq not in stream.pending:
+                if stream.gap_since is None:
+                    stream.gap_since = now
+                if len(stream.pending) <= self.reorder_window and now - stream.gap_since < self.gap_timeout:
+                    return
+                # Give up on the missing report and resume at the oldest buffered one
+                resume = min(stream.pending)
+                stream.lost += resume - stream.next_seq
+                stream.next_seq = resume
+
+            stream.gap_since = None
+            entries, exits = stream.pending.pop(stream.next_seq)
+            stream.next_seq += 1
+            stream.applied += 1
+            self._apply(entries, exits)
+
+    def _apply(self, entries: int, exits: int):
+        restaurant = self.restaurant
+        # Doors miss people; clamp so the fused count stays within bounds
+        # rather than rejecting the whole delta
+        exits = min(exits, restaurant.current_customers + entries)
+        net = entries - exits
+        if net > 0:
+            net = min(net, restaurant.max_capacity - restaurant.current_customers)
+            if net > 0:
+                restaurant.current_customers += net
+        elif net < 0:
+            restaurant.current_customers += net
+        restaurant.entry_count += entries
+        restaurant.exit_count += exits
+
+    def crowd_level(self) -> float:
+        """Fused crowd level 0-100"""
+        return min(100.0, float(self.restaurant.get_occupancy_rate()))
+
+    def maybe_publish(self, force: bool = False) -> Optional[dict]:
+        """
+        Publish the fused crowd level if the interval elapsed and it changed
+
+        Also applies deltas whose missing predecessor timed out, so a quiet
+        sensor's buffered reports are not held until it reports again. The
+        level only counts as published once the client accepted it; a failed
+        send is retried on the next call.
+
+        Returns:
+            The client's response, or None if nothing was sent
+
+        Raises:
+            Whatever the client raises when the send fails
+        """
+        with self._lock:
+            now = self.clock()
+            for stream in self.sensors.values():
+                if stream.pending:
+                    self._drain(stream, now)
+            level = self.crowd_level()
+            if not force:
+                if self.last_publish_time is not None and now - self.last_publish_time < self.publish_interval:
+                    return None
+                if self.last_published_level is not None and abs(level - self.last_published_level) < self.min_change:
+                    return None
+
+        if self.client is None:
+            result = {'success': True, 'locationId': self.location_id, 'crowdLevel': level}
+        else:
+            result = self.client.send_update(level)
+            if isinstance(result, dict) and result.get('success') is False:
+                return result
+
+        with self._lock:
+            self.last_publish_time = now
+            self.last_published_level = level
+            self.publish_count += 1
+        return result
+
+    def get_status(self) -> dict:
+        """Fused restaurant status plus per-sensor ordering stats"""
+        with self._lock:
+            status = self.restaurant.get_status()
+            status['crowd_level'] = self.crowd_level()
+            status['sensors'] = {
+                sensor_id: {
+                    'epoch': stream.epoch,
+                    'next_seq': stream.next_seq,
+                    'pending': len(stream.pending),
+                    'applied': stream.applied,
+                    'duplicates': stream.duplicates,
+                    'lost': stream.lost
+                }
+                for sensor_id, stream in self.sensors.items()
+            }
+            return status
@@ -0,0 +1,348 @@
+"""
+Shared-memory occupancy table for local consumer processes
+
+One writer process (e.g. the gateway running RestaurantManager) publishes
+occupancy and open/closed state into a fixed-layout
+multiprocessing.shared_memory block. Any number of reader processes
+(status display, local dashboard) attach by name and read records
+straight out of the shared buffer without locks or copies.
+
+Consistency uses a seqlock: the writer bumps a sequence counter to an odd
+value before changing records and back to even afterwards. A reader
+samples the counter, reads, and samples it again; if it was odd or moved,
+the read overlapped a write and is retried.
+
+Layout (little-endian):
+    header, 64 bytes: magic b"OCC1" | layout version u16 | record size u16 |
+                      slots u32 | count u32 | seq u64 | padding
+    record, 80 bytes: restaurant id 48s (utf-8, NUL padded) |
+                      current_customers u32 | max_capacity u32 |
+                      entry_count u32 | exit_count u32 | flags u8 |
+                      padding 3 | occupancy_rate f32 | updated_at f64
+
+The seqlock relies on stores becoming visible in program order, which
+holds on x86; readers on weakly ordered CPUs may need a wider retry.
+
+Usage:
+    # writer
+    from SharedOccupancy import SharedOccupancyTable
+    table = SharedOccupancyTable.create("dining-occupancy", slots=256)
+    table.publish_from(manager)        # writes all, then follows the change feed
+
+    # reader, in another process
+    table = SharedOccupancyTable.attach("dining-occupancy")
+    table.snapshot()                   # {restaurant_id: {...}, ...}
+"""
+
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+
+MAGIC = b"OCC1"
+LAYOUT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHII")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 16
+HEADER_SIZE = 64
+
+_RECORD = struct.Struct("<48sIIIIB3xfd")
+RECORD_SIZE = _RECORD.size
+ID_SIZE = 48
+
+FLAG_OPEN = 0x01
+FLAG_REMOVED = 0x02
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach without letting this process's resource tracker unlink the block"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Python < 3.13 registers attached blocks too, so a reader exiting would
+    # unlink the writer's segment; skip the registration for this attach
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+
+    def register_except_shared_memory(name, rtype):
+        if rtype != "shared_memory":
+            register(name, rtype)
+
+    resource_tracker.register = register_except_shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedOccupancyTable:
+    """
+    Fixed-size occupancy table in shared memory, one writer, many readers
+
+    Attributes:
+        name: Shared memory block name
+        slots: Maximum number of restaurant records
+        writable: True for the process that created the table
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, writable: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.name = shm.name
+        self.writable = writable
+
+        magic, version, record_size, slots, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"Shared memory block {shm.name!r} is not an occupancy table")
+        self.slots = slots
+
+        self._slot_of: Dict[str, int] = {}
+        self._ids: list = []
+        self._seq = self._read_seq()
+        self._unsubscribe = None
+        # Serializes writer threads so the seqlock counter and records are
+        # only ever changed by one transaction at a time
+        self._write_lock = threading.RLock()
+        # Change feed version last written per restaurant by publish_from
+        self._published_versions: Dict[str, int] = {}
+        # Reads that overlapped a write and had to be retried
+        self.retries = 0
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, slots: int = 256) -> "SharedOccupancyTable":
+        """Create a new table (the writer side)"""
+        if slots <= 0:
+            raise ValueError(f"slots must be positive, got {slots}")
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + slots * RECORD_SIZE)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, LAYOUT_VERSION, RECORD_SIZE, slots, 0)
+        _SEQ.pack_into(shm.buf, _SEQ_OFFSET, 0)
+        return cls(shm, writable=True)
+
+    @classmethod
+    def attach(cls, name: str, writable: bool = False) -> "SharedOccupancyTable":
+        """
+        Attach to an existing table (the reader side)
+
+        writable=True takes over as the single writer, e.g. after the
+        original writer restarted; there must not be two writers at once.
+        """
+        table = cls(_attach_untracked(name), writable=writable)
+        if writable:
+            table._refresh_ids(table._read_count())
+            if table._seq & 1:
+                # Previous writer died mid-transaction; close it out
+                table._seq += 1
+                _SEQ.pack_into(table._buf, _SEQ_OFFSET, table._seq)
+        return table
+
+    def close(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the shared block; only the writer should call this"""
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.writable:
+            self.unlink()
+
+    # -- seqlock ----------------------------------------------------------
+
+    def _read_seq(self) -> int:
+        return _SEQ.unpack_from(self._buf, _SEQ_OFFSET)[0]
+
+    def _backoff(self, attempt: int):
+        self.retries += 1
+        if attempt:
+            # Let a preempted writer finish its transaction
+            time.sleep(0)
+
+    def _read_count(self) -> int:
+        return _HEADER.unpack_from(self._buf, 0)[4]
+
+    @property
+    def version(self) -> int:
+        """Sequence number; even when stable, changes on every write"""
+        return self._read_seq()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several record writes under one odd/even seqlock bump
+
+        Safe to use from several writer threads in this process; they take
+        turns, so readers never see two overlapping writes.
+        """
+        if not self.writable:
+            raise PermissionError("Table was attached read-only")
+        with self._write_lock:
+            self._seq += 1
+            _SEQ.pack_into(self._buf, _SEQ_OFFSET, self._seq)
+            try:
+                yield
+            finally:
+                self._seq += 1
+                _SEQ.pack_into(self._buf, _SEQ_OFFSET, self._seq)
+
+    # -- writer -----------------------------------------------------------
+
+    def _slot_for(self, restaurant_id: str) -> int:
+        slot = self._slot_of.get(restaurant_id)
+        if slot is not None:
+            return slot
+        if len(self._slot_of) >= self.slots:
+            raise OverflowError(f"Occupancy table is full ({self.slots} slots)")
+        if len(restaurant_id.encode("utf-8")) > ID_SIZE:
+            raise ValueError(f"restaurant id longer than {ID_SIZE} bytes: {restaurant_id}")
+        slot = self._slot_of[restaurant_id] = len(self._slot_of)
+        # Slots are only ever appended, so readers can cache id -> slot
+        _HEADER.pack_into(self._buf, 0, MAGIC, LAYOUT_VERSION, RECORD_SIZE, self.slots, slot + 1)
+        return slot
+
+    def _write_record(self, restaurant_id: str, status: Optional[dict], now: float):
+        slot = self._slot_for(restaurant_id)
+        if status is None:
+            flags = FLAG_REMOVED
+            values = (0, 0, 0, 0, 0.0)
+        else:
+            flags = FLAG_OPEN if status.get('is_open') else 0
+            values = (
+                int(status.get('current_customers', 0)),
+                int(status.get('max_capacity', 0)),
+                int(status.get('entry_count', 0)),
+                int(status.get('exit_count', 0)),
+                float(status.get('occupancy_rate', 0.0))
+            )
+        current, capacity, entries, exits, rate = values
+        _RECORD.pack_into(
+            self._buf, HEADER_SIZE + slot * RECORD_SIZE,
+            restaurant_id.encode("utf-8"), current, capacity, entries, exits, flags, rate, now
+        )
+
+    def write(self, restaurant_id: str, status: Optional[dict]):
+        """Publish one restaurant's status (None marks it removed)"""
+        with self.transaction():
+            self._write_record(restaurant_id, status, time.time())
+
+    def write_many(self, statuses: Iterable[Tuple[str, Optional[dict]]]):
+        """Publish several statuses under a single seqlock bump"""
+        now = time.time()
+        with self.transaction():
+            for restaurant_id, status in statuses:
+                self._write_record(restaurant_id, status, now)
+
+    def publish_from(self, manager):
+        """
+        Write every restaurant in a RestaurantManager, then keep the table
+        current by following its change feed
+
+        Changes may be delivered from several threads (e.g. the main loop and
+        the config watcher), so a change older than the one already written
+        for that restaurant is skipped. Write failures such as a full table
+        are reported by the change feed.
+        """
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+        self._unsubscribe = manager.subscribe(self._write_change)
+        self.write_many(
+            (restaurant_id, restaurant.get_status())
+            for restaurant_id, restaurant in list(manager.restaurants.items())
+        )
+
+    def _write_change(self, change: dict):
+        restaurant_id = change['restaurant_id']
+        with self._write_lock:
+            if change['version'] <= self._published_versions.get(restaurant_id, 0):
+                return
+            self.write(restaurant_id, change['status'])
+            self._published_versions[restaurant_id] = change['version']
+
+    # -- readers ----------------------------------------------------------
+
+    def _refresh_ids(self, count: int):
+        buf = self._buf
+        for slot in range(len(self._ids), count):
+            raw_id = bytes(buf[HEADER_SIZE + slot * RECORD_SIZE:HEADER_SIZE + slot * RECORD_SIZE + ID_SIZE])
+            restaurant_id = raw_id.rstrip(b"\0").decode("utf-8")
+            self._ids.append(restaurant_id)
+            self._slot_of[restaurant_id] = slot
+
+    @staticmethod
+    def _decode(values) -> Optional[dict]:
+        _, current, capacity, entries, exits, flags, rate, updated_at = values
+        if flags & FLAG_REMOVED:
+            return None
+        return {
+            'current_customers': current,
+            'max_capacity': capacity,
+            'occupancy_rate': rate,
+            'entry_count': entries,
+            'exit_count': exits,
+            'is_open': bool(flags & FLAG_OPEN),
+            'updated_at': updated_at
+        }
+
+    def get(self, restaurant_id: str, max_retries: int = 1000) -> Optional[dict]:
+        """Consistent read of one restaurant's status, or None if unknown/removed"""
+        buf = self._buf
+        for attempt in range(max_retries):
+            seq = self._read_seq()
+            if seq & 1:
+                self._backoff(attempt)
+                continue
+            count = self._read_count()
+            if count > len(self._ids):
+                known = len(self._ids)
+                self._refresh_ids(count)
+                if self._read_seq() != seq:
+                    # New ids may have been mid-write; forget them and retry
+                    for stale in self._ids[known:]:
+                        del self._slot_of[stale]
+                    del self._ids[known:]
+                    self._backoff(attempt)
+                    continue
+            slot = self._slot_of.get(restaurant_id)
+            if slot is None:
+                return None
+            values = _RECORD.unpack_from(buf, HEADER_SIZE + slot * RECORD_SIZE)
+            if self._read_seq() == seq:
+                return self._decode(values)
+            self._backoff(attempt)
+        raise TimeoutError("Writer kept the table busy; no consistent read")
+
+    def snapshot(self, max_retries: int = 1000) -> Dict[str, dict]:
+        """Consistent view of every restaurant, taken under one seqlock window"""
+        buf = self._buf
+        unpack = _RECORD.unpack_from
+        for attempt in range(max_retries):
+            seq = self._read_seq()
+            if seq & 1:
+                self._backoff(attempt)
+                continue
+            count = self._read_count()
+            rows = [unpack(buf, HEADER_SIZE + slot * RECORD_SIZE) for slot in range(count)]
+            if self._read_seq() != seq:
+                self._backoff(attempt)
+                continue
+            if count > len(self._ids):
+                self._refresh_ids(count)
+            result = {}
+            for restaurant_id, values in zip(self._ids, rows):
+                status = self._decode(values)
+                if status is not None:
+                    result[restaurant_id] = status
+            return result
+        raise TimeoutError("Writer kept the table busy; no consistent snapshot")
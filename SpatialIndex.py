@@ -0,0 +1,311 @@
+"""
+Grid-based spatial index for dining locations
+
+Buckets (lat, lng) points into fixed-size degree cells so that "nearest"
+and "within radius" queries only look at the handful of cells around the
+query point instead of every location.
+
+Usage:
+    from SpatialIndex import SpatialIndex
+
+    index = SpatialIndex()
+    index.insert("kerr-drummond", 36.1283, -97.0711)
+    index.nearest(36.1270, -97.0690, k=3)
+    index.within_radius(36.1270, -97.0690, 500)
+"""
+
+import heapq
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+# Cells per side of the coarse blocks nearest() uses to skip empty space
+BLOCK_CELLS = 16
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters between two lat/lng points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _wrap_lng_range(lng_lo: float, lng_hi: float) -> List[Tuple[float, float]]:
+    """Split a longitude interval that crosses the antimeridian into in-range pieces"""
+    if lng_hi - lng_lo >= 360.0:
+        return [(-180.0, 180.0)]
+    ranges = [(max(lng_lo, -180.0), min(lng_hi, 180.0))]
+    if lng_lo < -180.0:
+        ranges.append((lng_lo + 360.0, 180.0))
+    if lng_hi > 180.0:
+        ranges.append((-180.0, lng_hi - 360.0))
+    return ranges
+
+
+def _haversine_bound_m(dlat: float, dlng: float, cos_product: float) -> float:
+    """
+    Haversine distance for degree gaps dlat/dlng, with cos(lat1) * cos(lat2)
+    replaced by a lower bound; never more than the true distance
+    """
+    a = math.sin(math.radians(dlat) / 2) ** 2 + cos_product * math.sin(math.radians(min(dlng, 180.0)) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lng grid over a set of keyed points
+
+    Attributes:
+        cell_deg: Cell edge length in degrees (default ~550 m of latitude)
+        points: Mapping of key -> (lat, lng)
+    """
+
+    def __init__(self, cell_deg: float = 0.005):
+        if cell_deg <= 0:
+            raise ValueError(f"cell_deg must be positive, got {cell_deg}")
+        self.cell_deg = cell_deg
+        self.points: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        # Occupied cells grouped into BLOCK_CELLS x BLOCK_CELLS blocks
+        self._blocks: Dict[Tuple[int, int], set] = {}
+        # Occupied cell extent; only grows, which keeps it a safe upper bound
+        self._extent: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.points
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    @staticmethod
+    def _block(cell: Tuple[int, int]) -> Tuple[int, int]:
+        return (cell[0] // BLOCK_CELLS, cell[1] // BLOCK_CELLS)
+
+    def insert(self, key: str, lat: float, lng: float):
+        """Add a point, replacing any existing point with the same key"""
+        if key in self.points:
+            self.remove(key)
+        lat = float(lat)
+        lng = float(lng)
+        self.points[key] = (lat, lng)
+        cell = self._cell(lat, lng)
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            bucket = self._cells[cell] = []
+            self._blocks.setdefault(self._block(cell), set()).add(cell)
+        bucket.append(key)
+        if self._extent is None:
+            self._extent = (cell[0], cell[0], cell[1], cell[1])
+        else:
+            i_lo, i_hi, j_lo, j_hi = self._extent
+            self._extent = (min(i_lo, cell[0]), max(i_hi, cell[0]),
+                            min(j_lo, cell[1]), max(j_hi, cell[1]))
+
+    def remove(self, key: str) -> bool:
+        """Remove a point; returns False if the key was not indexed"""
+        point = self.points.pop(key, None)
+        if point is None:
+            return False
+        cell = self._cell(*point)
+        bucket = self._cells[cell]
+        bucket.remove(key)
+        if not bucket:
+            del self._cells[cell]
+            block = self._blocks[self._block(cell)]
+            block.discard(cell)
+            if not block:
+                del self._blocks[self._block(cell)]
+        return True
+
+    def _lng_cell_range(self, lng_lo: float, lng_hi: float) -> Tuple[int, int]:
+        return (math.floor(lng_lo / self.cell_deg), math.floor(lng_hi / self.cell_deg))
+
+    def _ring(self, center: Tuple[int, int], r: int):
+        """Yield the cell keys at Chebyshev distance exactly r from center"""
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        for dj in range(-r, r + 1):
+            yield (ci - r, cj + dj)
+            yield (ci + r, cj + dj)
+        for di in range(-r + 1, r):
+            yield (ci + di, cj - r)
+            yield (ci + di, cj + r)
+
+    def _min_ring_distance_m(self, lat: float, r: int) -> float:
+        """
+        Lower bound on the distance from a query point to any cell outside
+        ring r. Longitude cells shrink toward the poles, so use the width at
+        the most poleward latitude the ring can reach. Only valid while the
+        ring stays clear of the antimeridian.
+        """
+        if r <= 0:
+            return 0.0
+        edge_lat = min(90.0, abs(lat) + (r + 1) * self.cell_deg)
+        return _haversine_bound_m(0.0, r * self.cell_deg, math.cos(math.radians(lat)) * math.cos(math.radians(edge_lat)))
+
+    def _box_min_distance_m(self, lat: float, lng: float, i_lo: int, j_lo: int, size: int) -> float:
+        """
+        Lower bound on the distance from (lat, lng) to any point in the
+        size x size cell box whose south-west cell is (i_lo, j_lo), taking
+        the shorter way around in longitude
+        """
+        lat_lo = i_lo * self.cell_deg
+        lat_hi = lat_lo + size * self.cell_deg
+        dlat = max(lat_lo - lat, lat - lat_hi, 0.0)
+        width = size * self.cell_deg
+        offset = (lng - j_lo * self.cell_deg) % 360.0
+        dlng = 0.0 if offset < width else min(offset - width, 360.0 - offset)
+        edge_lat = min(90.0, max(abs(lat_lo), abs(lat_hi)))
+        return _haversine_bound_m(dlat, dlng, math.cos(math.radians(lat)) * math.cos(math.radians(edge_lat)))
+
+    def _max_ring(self, center: Tuple[int, int]) -> int:
+        """Ring index beyond which no occupied cell exists"""
+        if self._extent is None:
+            return 0
+        ci, cj = center
+        i_lo, i_hi, j_lo, j_hi = self._extent
+        return max(abs(i_lo - ci), abs(i_hi - ci), abs(j_lo - cj), abs(j_hi - cj))
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int = 1,
+        predicate: Optional[Callable[[str], bool]] = None,
+        max_distance_m: Optional[float] = None
+    ) -> List[Tuple[float, str]]:
+        """
+        Find the k nearest points to (lat, lng)
+
+        Args:
+            lat: Query latitude
+            lng: Query longitude
+            k: Number of results to return
+            predicate: Optional filter; only keys for which it returns True count
+            max_distance_m: Optional cutoff distance in meters
+
+        Returns:
+            List of (distance_m, key) tuples, closest first
+        """
+        if k <= 0 or not self.points:
+            return []
+
+        cells = self._cells
+        points = self.points
+        best: List[Tuple[float, str]] = []  # max-heap via negated distance
+
+        def scan(cell):
+            for key in cells.get(cell, ()):
+                if len(best) < k:
+                    # Filter first: while the heap fills, every survivor is kept
+                    if predicate is not None and not predicate(key):
+                        continue
+                    dist = haversine_m(lat, lng, *points[key])
+                    if max_distance_m is None or dist <= max_distance_m:
+                        heapq.heappush(best, (-dist, key))
+                else:
+                    dist = haversine_m(lat, lng, *points[key])
+                    if dist < -best[0][0] and (predicate is None or predicate(key)):
+                        heapq.heapreplace(best, (-dist, key))
+
+        def done(bound):
+            if len(best) == k and -best[0][0] <= bound:
+                return True
+            return max_distance_m is not None and bound > max_distance_m
+
+        # Phase 1: rings around the query cell, while the cells probed so far
+        # are fewer than the occupied blocks phase 2 would bound, and the
+        # rings do not reach the antimeridian
+        center = self._cell(lat, lng)
+        ci, cj = center
+        max_ring = self._max_ring(center)
+        budget = max(9, len(self._blocks))
+        r = 0
+        while ((2 * r + 1) ** 2 <= budget
+               and (cj - r) * self.cell_deg >= -180.0 and (cj + r + 1) * self.cell_deg <= 180.0):
+            for cell in self._ring(center, r):
+                scan(cell)
+            if done(self._min_ring_distance_m(lat, r)) or r >= max_ring:
+                return sorted((-neg, key) for neg, key in best)
+            r += 1
+
+        # Phase 2: best-first over the remaining occupied blocks, then their
+        # cells, closest lower bound first
+        size = BLOCK_CELLS
+        queue = [
+            (self._box_min_distance_m(lat, lng, block[0] * size, block[1] * size, size), 0, block)
+            for block in self._blocks
+        ]
+        heapq.heapify(queue)
+        while queue:
+            bound, is_cell, item = heapq.heappop(queue)
+            if done(bound):
+                break
+            if is_cell:
+                scan(item)
+                continue
+            for cell in self._blocks[item]:
+                if max(abs(cell[0] - ci), abs(cell[1] - cj)) >= r:
+                    heapq.heappush(queue, (self._box_min_distance_m(lat, lng, cell[0], cell[1], 1), 1, cell))
+
+        return sorted((-neg, key) for neg, key in best)
+
+    def within_radius(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        predicate: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[float, str]]:
+        """
+        Find every point within radius_m meters of (lat, lng)
+
+        Returns:
+            List of (distance_m, key) tuples, closest first
+        """
+        if radius_m < 0 or not self.points:
+            return []
+
+        # Degree span of the radius; widen the longitude span by latitude
+        lat_span = math.degrees(radius_m / EARTH_RADIUS_M)
+        cos_lat = math.cos(math.radians(min(89.0, abs(lat) + lat_span)))
+        lng_span = min(180.0, lat_span / max(cos_lat, 1e-6))
+
+        i_lo = self._cell(lat - lat_span, 0.0)[0]
+        i_hi = self._cell(lat + lat_span, 0.0)[0]
+        j_ranges = [self._lng_cell_range(lo, hi) for lo, hi in _wrap_lng_range(lng - lng_span, lng + lng_span)]
+
+        results = []
+        cells = self._cells
+        n_candidates = (i_hi - i_lo + 1) * sum(j_hi - j_lo + 1 for j_lo, j_hi in j_ranges)
+        if n_candidates > len(cells):
+            # Radius covers more cells than are occupied; walk the occupied ones
+            candidate_cells = [
+                c for c in cells
+                if i_lo <= c[0] <= i_hi and any(j_lo <= c[1] <= j_hi for j_lo, j_hi in j_ranges)
+            ]
+        else:
+            candidate_cells = {
+                (i, j)
+                for j_lo, j_hi in j_ranges
+                for i in range(i_lo, i_hi + 1)
+                for j in range(j_lo, j_hi + 1)
+            }
+
+        for cell in candidate_cells:
+            for key in cells.get(cell, ()):
+                plat, plng = self.points[key]
+                dist = haversine_m(lat, lng, plat, plng)
+                if dist <= radius_m and (predicate is None or predicate(key)):
+                    results.append((dist, key))
+
+        results.sort()
+        return results
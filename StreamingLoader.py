@@ -0,0 +1,163 @@
+"""
+Streaming loader for large dining location files
+
+Reads location records one at a time from either a JSON array export
+(dining-locations.json) or a JSON-lines export (one object per line),
+without ever holding the whole file in memory. Each record can be
+projected down to the fields the caller needs, so long descriptions,
+links and other unused fields are dropped as soon as a record is parsed.
+
+Usage:
+    from StreamingLoader import iter_locations
+
+    for record in iter_locations("dining-locations.json"):
+        print(record["name"], record.get("coordinates"))
+
+    # keep everything
+    iter_locations("campuses.jsonl", fields=None)
+"""
+
+import json
+from typing import Callable, Iterator, Optional, Sequence
+
+from MenuIndex import INDEXED_FIELDS
+
+# Fields RestaurantManager needs to build, locate and menu-search a restaurant
+LOAD_FIELDS = ("hours", "crowdLevel", "coordinates") + INDEXED_FIELDS
+
+JSON_LINES_SUFFIXES = (".jsonl", ".ndjson")
+
+_WHITESPACE = " \t\n\r"
+
+
+def project(record, fields: Optional[Sequence[str]]):
+    """Keep only the given fields of a record (all fields if fields is None)"""
+    if fields is None or not isinstance(record, dict):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+def _iter_json_array(file, chunk_size: int) -> Iterator:
+    """
+    Yield the elements of a top-level JSON array one at a time
+
+    The buffer only ever holds the unconsumed tail plus the record being
+    decoded, so memory is bounded by the largest single record.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill(min_size):
+        nonlocal buffer, pos, eof
+        # Drop consumed text before growing the buffer
+        buffer = buffer[pos:]
+        pos = 0
+        chunk = file.read(max(chunk_size, min_size))
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill(chunk_size)
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != "[":
+        raise ValueError("Expected a JSON array of locations")
+    pos += 1
+
+    expect_value = True
+    first = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of file inside JSON array")
+
+        char = buffer[pos]
+        if char == "]" and (first or not expect_value):
+            return
+        if not expect_value:
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {pos}")
+            pos += 1
+            expect_value = True
+            continue
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Malformed location record: {e}") from None
+                # Record spans the chunk boundary; at least double what we hold
+                fill(len(buffer) - pos)
+                continue
+            if end == len(buffer) and not eof:
+                # A bare number/literal may continue in the next chunk
+                fill(chunk_size)
+                continue
+            break
+
+        pos = end
+        first = False
+        expect_value = False
+        yield value
+
+
+def iter_locations(
+    path: str,
+    fields: Optional[Sequence[str]] = LOAD_FIELDS,
+    chunk_size: int = 64 * 1024,
+    on_error: Optional[Callable[[str], None]] = None
+) -> Iterator[dict]:
+    """
+    Stream location records from a JSON array or JSON-lines file
+
+    Args:
+        path: File path; .jsonl/.ndjson (or content not starting with '[')
+            is read as JSON lines
+        fields: Fields to keep per record, or None to keep everything
+        chunk_size: Characters read per chunk for JSON arrays
+        on_error: Called with a message for each malformed JSON-lines record,
+            which is then skipped
+
+    Yields:
+        Projected record dicts
+
+    Raises:
+        ValueError: If a JSON array file is malformed
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        json_lines = path.lower().endswith(JSON_LINES_SUFFIXES)
+        if not json_lines:
+            # Peek at the first non-whitespace character to detect the format
+            while True:
+                char = file.read(1)
+                if not char or char not in _WHITESPACE:
+                    break
+            json_lines = char != "["
+            file.seek(0)
+
+        if not json_lines:
+            for record in _iter_json_array(file, chunk_size):
+                yield project(record, fields)
+            return
+
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                if on_error is not None:
+                    on_error(f"Line {line_number}: {e}")
+                continue
+            yield project(record, fields)
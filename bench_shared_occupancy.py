@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared-memory occupancy table reader throughput under writes
+
+One writer process updates random restaurants as fast as it can (or at a
+fixed rate) while several reader processes take full snapshots and
+single-restaurant reads from the same SharedOccupancyTable.
+
+Usage:
+    python bench_shared_occupancy.py [readers] [seconds] [restaurants]
+"""
+
+import multiprocessing
+import random
+import sys
+import time
+
+from SharedOccupancy import SharedOccupancyTable
+
+
+def writer(name, restaurant_ids, stop, counter):
+    table = SharedOccupancyTable.attach(name, writable=True)
+    rng = random.Random(1)
+    writes = 0
+    while not stop.is_set():
+        restaurant_id = rng.choice(restaurant_ids)
+        current = rng.randint(0, 100)
+        table.write(restaurant_id, {
+            'current_customers': current,
+            'max_capacity': 100,
+            'occupancy_rate': float(current),
+            'is_open': True
+        })
+        writes += 1
+    counter.value = writes
+    table.close()
+
+
+def reader(name, restaurant_ids, mode, stop, counter, retries):
+    table = SharedOccupancyTable.attach(name)
+    rng = random.Random()
+    reads = 0
+    while not stop.is_set():
+        if mode == "snapshot":
+            table.snapshot()
+        else:
+            table.get(rng.choice(restaurant_ids))
+        reads += 1
+    counter.value = reads
+    retries.value = table.retries
+    table.close()
+
+
+def run(mode, readers, seconds, restaurant_ids, with_writer):
+    table = SharedOccupancyTable.create(slots=len(restaurant_ids))
+    table.write_many((restaurant_id, {'max_capacity': 100, 'is_open': True}) for restaurant_id in restaurant_ids)
+
+    stop = multiprocessing.Event()
+    reader_counts = [multiprocessing.Value('q', 0) for _ in range(readers)]
+    retry_counts = [multiprocessing.Value('q', 0) for _ in range(readers)]
+    write_count = multiprocessing.Value('q', 0)
+    processes = [
+        multiprocessing.Process(target=reader, args=(table.name, restaurant_ids, mode, stop, count, retry))
+        for count, retry in zip(reader_counts, retry_counts)
+    ]
+    if with_writer:
+        processes.append(multiprocessing.Process(target=writer, args=(table.name, restaurant_ids, stop, write_count)))
+
+    for process in processes:
+        process.start()
+    time.sleep(seconds)
+    stop.set()
+    for process in processes:
+        process.join()
+
+    table.close()
+    table.unlink()
+
+    total_reads = sum(count.value for count in reader_counts)
+    total_retries = sum(retry.value for retry in retry_counts)
+    return total_reads / seconds, write_count.value / seconds, total_retries / max(total_reads, 1)
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    restaurants = int(sys.argv[3]) if len(sys.argv) > 3 else 27
+    restaurant_ids = [f"restaurant_{i}" for i in range(restaurants)]
+
+    print("⏱️  Shared occupancy table benchmark")
+    print("=" * 50)
+    print(f"{readers} reader(s), {restaurants} restaurants, {seconds:g}s per run\n")
+    print(f"   {'mode':<10} {'writer':<8} {'reads/s':>12} {'writes/s':>12} {'retries/read':>13}")
+    for mode in ("get", "snapshot"):
+        for with_writer in (False, True):
+            reads, writes, retry_rate = run(mode, readers, seconds, restaurant_ids, with_writer)
+            print(f"   {mode:<10} {'yes' if with_writer else 'no':<8} {reads:>12,.0f} {writes:>12,.0f} {retry_rate:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
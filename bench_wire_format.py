@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON vs compact binary crowd-level uplink
+
+Compares request body size and encode/decode CPU time for a single
+update and for bulk replays. "legacy json" is the pre-binary payload,
+which also carried apiKey in the body.
+
+Usage:
+    python bench_wire_format.py
+"""
+
+import json
+import random
+import timeit
+
+from SensorClient import encode_updates, decode_updates
+
+
+def legacy_json_body(updates, api_key="change-me-to-a-secure-random-string"):
+    location_id, crowd_level, _ = updates[0]
+    return json.dumps({"locationId": location_id, "crowdLevel": float(crowd_level), "apiKey": api_key}).encode("utf-8")
+
+
+def bench(label, updates, repeat=2000):
+    print(f"\n📦 {label} ({len(updates)} reading(s))")
+    print(f"   {'format':<12} {'bytes':>8} {'encode µs':>10} {'decode µs':>10}")
+
+    if len(updates) == 1:
+        body = legacy_json_body(updates)
+        encode_us = timeit.timeit(lambda: legacy_json_body(updates), number=repeat) / repeat * 1e6
+        decode_us = timeit.timeit(lambda: json.loads(body), number=repeat) / repeat * 1e6
+        print(f"   {'legacy json':<12} {len(body):>8} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+    for wire_format in ("json", "binary"):
+        body, headers = encode_updates(updates, wire_format)
+        content_type = headers["Content-Type"]
+        content_encoding = headers.get("Content-Encoding")
+        encode_us = timeit.timeit(lambda: encode_updates(updates, wire_format), number=repeat) / repeat * 1e6
+        decode_us = timeit.timeit(
+            lambda: decode_updates(body, content_type, content_encoding), number=repeat
+        ) / repeat * 1e6
+        name = wire_format + ("+gzip" if content_encoding else "")
+        print(f"   {name:<12} {len(body):>8} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+
+def main():
+    print("⏱️  Crowd-level wire format benchmark")
+    print("=" * 50)
+
+    start = 1730000000
+    bench("Single update", [("kerr-drummond", 45.5, None)], repeat=20000)
+    bench("Replay, 1 min @ 1 Hz", [("kerr-drummond", (i * 7) % 100, start + i) for i in range(60)], repeat=2000)
+    bench("Replay, 1 h @ 1 Hz", [("kerr-drummond", (i * 7) % 100, start + i) for i in range(3600)], repeat=50)
+
+    # Random-walk levels with jittered report times, closer to real sensors
+    rng = random.Random(1)
+    level, now, noisy = 40.0, start, []
+    for _ in range(3600):
+        level = min(100.0, max(0.0, level + rng.gauss(0, 1.5)))
+        now += rng.randint(1, 3)
+        noisy.append(("kerr-drummond", round(level, 2), now))
+    bench("Replay, ~2 h noisy", noisy, repeat=50)
+    bench("Replay, 10 locations interleaved", [
+        (f"location-{i % 10}", round(rng.uniform(0, 100), 2), start + i // 10) for i in range(3600)
+    ], repeat=50)
+
+
+if __name__ == "__main__":
+    main()
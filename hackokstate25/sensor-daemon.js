@@ -212,8 +212,9 @@ class SimpleRateLimiter {
     }
 }
 
-// Update crowd level in Firestore
-async function updateCrowdLevel(locationId, crowdLevel, logger) {
+// Update crowd level in Firestore; timestamp is when the sensor took the reading (unix s, null = now).
+// Readings from the future (sensor clock ahead) are clamped to now so they cannot block later updates.
+async function updateCrowdLevel(locationId, crowdLevel, logger, timestamp = null) {
     try {
         const db = admin.firestore();
         const locationRef = db.collection(COLLECTION_NAME).doc(locationId);
@@ -226,12 +227,34 @@ async function updateCrowdLevel(locationId, crowdLevel, logger) {
         }
 
         // Get current crowd level
-        const currentLevel = docSnapshot.data().crowdLevel || 0;
+        const data = docSnapshot.data();
+        const currentLevel = data.crowdLevel || 0;
+        const now = admin.firestore.Timestamp.now();
+        const readingTime = timestamp
+            ? admin.firestore.Timestamp.fromMillis(Math.min(timestamp * 1000, now.toMillis()))
+            : now;
+        // Also clamp what is stored, in case it was written before clamping existed
+        const lastReadingMillis = data.lastReadingAt
+            ? Math.min(data.lastReadingAt.toMillis(), now.toMillis())
+            : null;
+
+        // A delayed or replayed reading must not overwrite a newer one
+        if (lastReadingMillis !== null && lastReadingMillis > readingTime.toMillis()) {
+            logger.debug(`Skipped ${locationId}: reading older than the stored one`);
+            return {
+                success: true,
+                skipped: true,
+                stale: true,
+                level: currentLevel,
+                locationId: locationId
+            };
+        }
 
         // Only update if value changed (avoid unnecessary writes)
         if (Math.abs(currentLevel - crowdLevel) > 0.5) {
             await locationRef.update({
                 crowdLevel: crowdLevel,
+                lastReadingAt: readingTime,
                 lastSensorUpdate: admin.firestore.FieldValue.serverTimestamp()
             });
 
@@ -257,6 +280,136 @@ async function updateCrowdLevel(locationId, crowdLevel, logger) {
     }
 }
 
+// Compact binary uplink (see SensorClient.py for the encoder), big-endian:
+//   header:   "CL" | version u8 | location count u8 | record count u16 | base timestamp u32 (unix s, 0 = now)
+//   id table: per location: locationId length u8 | locationId utf-8
+//   record:   [location index u8, only if location count > 1] | crowd level u16 (hundredths of a percent) |
+//             timestamp delta varint (zigzag LEB128 seconds since the previous record, the first from the base)
+const BINARY_CONTENT_TYPE = 'application/x-crowd-level';
+const BINARY_VERSION = 2;
+const BINARY_HEADER_SIZE = 10;
+
+// Zigzag LEB128; plain arithmetic because deltas can exceed 32 bits
+function readVarint(buffer, offset) {
+    let value = 0;
+    let scale = 1;
+    while (true) {
+        if (offset >= buffer.length) {
+            throw new Error('Invalid binary body: truncated record');
+        }
+        const byte = buffer.readUInt8(offset);
+        offset += 1;
+        value += (byte & 0x7f) * scale;
+        if (!(byte & 0x80)) {
+            break;
+        }
+        scale *= 128;
+        if (scale > 2 ** 49) {
+            throw new Error('Invalid binary body: varint too long');
+        }
+    }
+    const delta = value % 2 === 0 ? value / 2 : -(value + 1) / 2;
+    return { delta, offset };
+}
+
+function decodeCrowdLevelBinary(buffer) {
+    if (buffer.length < BINARY_HEADER_SIZE || buffer.toString('latin1', 0, 2) !== 'CL') {
+        throw new Error('Invalid binary body: bad magic');
+    }
+    const version = buffer.readUInt8(2);
+    if (version !== BINARY_VERSION) {
+        // 415 tells the client to fall back to a format we understand
+        const error = new Error(`Unsupported binary version: ${version}`);
+        error.status = 415;
+        throw error;
+    }
+
+    const idCount = buffer.readUInt8(3);
+    const count = buffer.readUInt16BE(4);
+    let timestamp = buffer.readUInt32BE(6);
+    let offset = BINARY_HEADER_SIZE;
+
+    const locationIds = [];
+    for (let i = 0; i < idCount; i++) {
+        if (offset >= buffer.length) {
+            throw new Error('Invalid binary body: truncated id table');
+        }
+        const end = offset + 1 + buffer.readUInt8(offset);
+        if (end > buffer.length) {
+            throw new Error('Invalid binary body: truncated id table');
+        }
+        locationIds.push(buffer.toString('utf8', offset + 1, end));
+        offset = end;
+    }
+
+    const updates = [];
+    for (let i = 0; i < count; i++) {
+        let index = 0;
+        if (idCount > 1) {
+            if (offset >= buffer.length) {
+                throw new Error('Invalid binary body: truncated record');
+            }
+            index = buffer.readUInt8(offset);
+            offset += 1;
+        }
+        if (index >= idCount || offset + 2 > buffer.length) {
+            throw new Error('Invalid binary body: truncated record');
+        }
+        const crowdLevel = buffer.readUInt16BE(offset) / 100;
+        const varint = readVarint(buffer, offset + 2);
+        offset = varint.offset;
+        timestamp += varint.delta;
+        updates.push({ locationId: locationIds[index], crowdLevel, timestamp: timestamp || null });
+    }
+    return updates;
+}
+
+// Normalize a request body (single JSON object, JSON { updates: [...] } batch, or binary) to a list of updates
+function extractUpdates(body) {
+    if (Buffer.isBuffer(body)) {
+        return decodeCrowdLevelBinary(body);
+    }
+    if (body && Array.isArray(body.updates)) {
+        return body.updates;
+    }
+    return [body || {}];
+}
+
+function validateUpdate(update) {
+    if (!update || !update.locationId) {
+        return 'Missing required field: locationId';
+    }
+    if (typeof update.crowdLevel !== 'number') {
+        return 'Missing or invalid field: crowdLevel (must be a number)';
+    }
+    if (update.crowdLevel < 0 || update.crowdLevel > 100) {
+        return 'crowdLevel must be between 0 and 100';
+    }
+    if (update.timestamp != null && (typeof update.timestamp !== 'number' || update.timestamp < 0)) {
+        return 'Invalid field: timestamp (must be unix seconds)';
+    }
+    return null;
+}
+
+// Apply a batch; only the newest reading per location (by timestamp) reaches Firestore
+async function updateCrowdLevelBatch(updates, logger) {
+    const now = Date.now() / 1000;
+    const latest = new Map();
+    for (const update of updates) {
+        const current = latest.get(update.locationId);
+        // Future timestamps count as now, like in updateCrowdLevel; ties go to
+        // the later entry, so untimestamped batches keep their order
+        if (!current || Math.min(update.timestamp || now, now) >= Math.min(current.timestamp || now, now)) {
+            latest.set(update.locationId, update);
+        }
+    }
+    const results = [];
+    for (const update of latest.values()) {
+        results.push(await updateCrowdLevel(update.locationId, update.crowdLevel, logger, update.timestamp || null));
+    }
+    return results;
+}
+
 // Start HTTP server
 function startServer() {
     console.log('🌐 Starting Sensor HTTP Server...');
@@ -275,6 +428,7 @@ function startServer() {
     );
 
     // Middleware
+    app.use(express.raw({ type: BINARY_CONTENT_TYPE, limit: '1mb' }));
     app.use(express.json({
         strict: true
     }));
@@ -311,6 +465,10 @@ function startServer() {
                         crowdLevel: 'number (required) - 0-100',
                         apiKey: 'string (optional) - Required if authentication enabled'
                     },
+                    formats: {
+                        'application/json': 'Single update object, or { updates: [...] } batch',
+                        [BINARY_CONTENT_TYPE]: 'Compact binary batch (see SensorClient.py); gzip Content-Encoding accepted'
+                    },
                     example: {
                         locationId: 'kerr-drummond',
                         crowdLevel: 45,
@@ -339,7 +497,7 @@ function startServer() {
 
         // Validate API key if required
         if (config.security?.requireApiKey) {
-            const providedKey = req.body.apiKey || req.headers['x-api-key'];
+            const providedKey = (Buffer.isBuffer(req.body) ? null : req.body.apiKey) || req.headers['x-api-key'];
             const expectedKey = config.security?.apiKey;
 
             if (!providedKey || providedKey !== expectedKey) {
@@ -351,40 +509,70 @@ function startServer() {
             }
         }
 
-        // Validate request body
-        const { locationId, crowdLevel } = req.body;
-
-        if (!locationId) {
-            return res.status(400).json({
+        // Reject bodies we cannot decode with 415 so clients can fall back
+        if (req.headers['content-type'] && !req.is(['json', 'urlencoded', BINARY_CONTENT_TYPE])) {
+            return res.status(415).json({
                 success: false,
-                error: 'Missing required field: locationId'
+                error: `Unsupported content type: ${req.get('content-type')}`
             });
         }
 
-        if (typeof crowdLevel !== 'number') {
-            return res.status(400).json({
+        // Decode request body (JSON, JSON batch, or compact binary)
+        let updates;
+        try {
+            updates = extractUpdates(req.body);
+        } catch (error) {
+            return res.status(error.status || 400).json({
                 success: false,
-                error: 'Missing or invalid field: crowdLevel (must be a number)'
+                error: error.message
             });
         }
 
-        // Validate crowd level range
-        if (crowdLevel < 0 || crowdLevel > 100) {
+        // Validate request body
+        if (updates.length === 0) {
             return res.status(400).json({
                 success: false,
-                error: 'crowdLevel must be between 0 and 100'
+                error: 'No updates in request body'
             });
         }
+        for (const update of updates) {
+            const validationError = validateUpdate(update);
+            if (validationError) {
+                return res.status(400).json({
+                    success: false,
+                    error: validationError
+                });
+            }
+        }
+
+        if (updates.length > 1) {
+            try {
+                const results = await updateCrowdLevelBatch(updates, logger);
+                return res.status(200).json({
+                    success: results.every(result => result.success),
+                    received: updates.length,
+                    results
+                });
+            } catch (error) {
+                logger.error('Unexpected error updating crowd levels:', error);
+                return res.status(500).json({
+                    success: false,
+                    error: 'Internal server error'
+                });
+            }
+        }
+
+        const { locationId, crowdLevel, timestamp } = updates[0];
 
         // Update Firestore
         try {
-            const result = await updateCrowdLevel(locationId, crowdLevel, logger);
+            const result = await updateCrowdLevel(locationId, crowdLevel, logger, timestamp || null);
 
             if (result.success) {
                 if (result.skipped) {
                     return res.status(200).json({
                         success: true,
-                        message: 'No update needed (value unchanged)',
+                        message: result.stale ? 'Reading older than the stored one' : 'No update needed (value unchanged)',
                         level: result.level,
                         locationId: result.locationId
                     });
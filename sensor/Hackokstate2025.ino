@@ -1,31 +1,79 @@
 # define SENSOR_PIN 52
+# define DEFAULT_BAUD 9600
+# define CONFIRM_TIMEOUT_MS 1000
+
+/* Must match BAUD_RATES in LinkManager.py */
+const long BAUD_RATES[] = {9600, 19200, 38400, 57600, 115200, 230400};
+const int NUM_BAUD_RATES = sizeof(BAUD_RATES) / sizeof(BAUD_RATES[0]);
 
 void setup() {
   pinMode(SENSOR_PIN, INPUT);
-  Serial.begin(9600);
+  Serial.begin(DEFAULT_BAUD);
   pinMode(LED_BUILTIN,OUTPUT);
 }
 
 int cmd;
 int last_state = LOW;
+long current_baud = DEFAULT_BAUD;
+long previous_baud = DEFAULT_BAUD;
+bool awaiting_baud_index = false;
+unsigned long confirm_started = 0;
+bool confirming = false; /* new baud rate not yet confirmed by a ping */
+
+void switch_baud(long baud) {
+  Serial.flush();
+  Serial.end();
+  Serial.begin(baud);
+  current_baud = baud;
+}
+
+void handle_command(int cmd) {
+  if (awaiting_baud_index) {
+    /* "B<index>": ack at the old rate, then switch */
+    awaiting_baud_index = false;
+    int index = cmd - '0';
+    if (0 <= index && index < NUM_BAUD_RATES) {
+      Serial.print('A');
+      Serial.println(index);
+      previous_baud = current_baud;
+      switch_baud(BAUD_RATES[index]);
+      confirming = true;
+      confirm_started = millis();
+    } else {
+      Serial.println('N');
+    }
+    return;
+  }
+  if ('0' <= cmd && '9' >= cmd) {
+    /* Ping */
+    confirming = false; /* host reached us at this rate */
+    Serial.print('P');
+    Serial.println((char)((cmd + 1 - '0') % 10 + '0'));
+  } else if ('B' == cmd) {
+    awaiting_baud_index = true;
+  }
+}
 
 void loop() {
-  if (Serial.available()) {
+  while (Serial.available()) {
     cmd = Serial.read();
-    if ('0' < cmd && '9' >= cmd) {
-      /* Ping */
-      Serial.write((cmd + 1 - '0') % 10 + '0');
-    }
+    handle_command(cmd);
+  }
+  if (confirming && millis() - confirm_started >= CONFIRM_TIMEOUT_MS) {
+    /* No ping at the new rate; fall back to the old one */
+    confirming = false;
+    switch_baud(previous_baud);
   }
   int sound=analogRead(A0);
-  Serial.writeln(sound);
+  Serial.print('S');
+  Serial.println(sound);
   if (last_state != digitalRead(SENSOR_PIN)) {
     if (LOW == last_state) {
-      Serial.writeln('H'); /* LOW to HIGH */
+      Serial.println('H'); /* LOW to HIGH */
       last_state = HIGH;
       digitalWrite(LED_BUILTIN, HIGH);
     } else {
-      Serial.writeln('L'); /* HIGH to LOW */
+      Serial.println('L'); /* HIGH to LOW */
       last_state = LOW;
       digitalWrite(LED_BUILTIN,LOW);
     }
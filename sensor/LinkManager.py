@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Serial link manager for the Arduino crowd sensor
+
+Wraps the pyserial port used by host.py and keeps the link healthy:
+
+- Pings the sketch every few seconds ('0'..'9' is answered with
+  "P<next digit>") to measure round-trip time and notice stalls
+- Negotiates a higher baud rate ("B<index>" -> "A<index>", then both sides
+  switch; the sketch falls back by itself if no ping arrives at the new
+  rate, and so does the host)
+- Resets (DTR toggle) and reopens a device that stopped answering; if the
+  port is gone (unplugged, or re-enumerating after the reset) it keeps
+  retrying with exponential backoff while read_event() returns None
+- Reports link RTT and the bytes/s actually delivered
+
+Sketch output is one framed line per message:
+    S<value>   sound sample
+    H / L      motion sensor rising / falling edge
+    P<digit>   ping reply
+    A<index>   baud change acknowledged (sent at the old rate)
+    N          baud change rejected
+
+Usage:
+    from LinkManager import SerialLinkManager
+
+    link = SerialLinkManager('/dev/ttyACM1', target_baud=115200)
+    link.open()
+    while True:
+        event = link.read_event()      # ('motion', 'H'), ('sound', 512) or None
+        ...
+    print(link.get_stats())
+"""
+
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import serial
+
+DEFAULT_BAUD = 9600
+# Must match BAUD_RATES in Hackokstate2025.ino
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200, 230400]
+
+
+class SerialLinkManager:
+    """
+    Health-monitored serial link to the sensor sketch
+
+    Attributes:
+        port: Serial device path (e.g. '/dev/ttyACM1' or 'COM4')
+        baud: Baud rate currently in use
+        target_baud: Highest rate to negotiate up to (None to stay at default)
+    """
+
+    def __init__(
+        self,
+        port: str,
+        target_baud: Optional[int] = 115200,
+        ping_interval: float = 2.0,
+        ping_timeout: float = 0.5,
+        stall_timeout: float = 5.0,
+        max_missed_pings: int = 3,
+        reset_delay: float = 2.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        serial_factory=serial.Serial
+    ):
+        """
+        Configure the link (nothing is opened until open())
+
+        Args:
+            port: Serial device path
+            target_baud: Highest baud rate to try; must be in BAUD_RATES
+            ping_interval: Seconds between health pings
+            ping_timeout: Seconds to wait for a ping reply
+            stall_timeout: Seconds without any received byte before resetting
+            max_missed_pings: Consecutive lost pings before resetting
+            reset_delay: Seconds to wait for the bootloader after a reset
+            reconnect_delay: Seconds before the first retry of a lost port
+            max_reconnect_delay: Cap for the doubling delay between retries
+            serial_factory: pyserial Serial class (injectable for testing)
+        """
+        if target_baud is not None and target_baud not in BAUD_RATES:
+            raise ValueError(f"target_baud must be one of {BAUD_RATES}, got {target_baud}")
+        self.port = port
+        self.target_baud = target_baud
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.stall_timeout = stall_timeout
+        self.max_missed_pings = max_missed_pings
+        self.reset_delay = reset_delay
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.serial_factory = serial_factory
+
+        self.serial = None
+        self.baud = DEFAULT_BAUD
+        self._ping_digit = 0
+        self._pending_ping = None  # (expected reply digit, send time)
+        self._next_ping_at = 0.0
+        self._missed_pings = 0
+        self._last_rx = 0.0
+        self._rtts = deque(maxlen=20)
+        self._rx_window = deque()  # (time, bytes) for throughput
+        self._retry_delay = reconnect_delay
+        self._reconnect_at = 0.0  # when read_event() may next try to reopen
+        self.pings_sent = 0
+        self.pings_lost = 0
+        self.resets = 0
+        self.reconnect_failures = 0
+        self.bytes_received = 0
+
+    # -- connection -------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        """False while the port is gone and reconnects are pending"""
+        return self.serial is not None
+
+    def open(self):
+        """
+        Open the port at the default rate, then try to speed up
+
+        Raises:
+            serial.SerialException: If the port cannot be opened
+        """
+        self._open_default()
+        if self.target_baud and self.target_baud > DEFAULT_BAUD:
+            self.negotiate_baud(self.target_baud)
+
+    def _open_default(self):
+        self.serial = self.serial_factory(self.port, DEFAULT_BAUD, timeout=0.1)
+        self.baud = DEFAULT_BAUD
+        time.sleep(self.reset_delay)  # Opening the port resets the Arduino
+        self.serial.reset_input_buffer()
+        self._last_rx = time.monotonic()
+
+    def close(self):
+        if self.serial is not None and self.serial.is_open:
+            self.serial.close()
+
+    def reset(self, negotiate: bool = True):
+        """
+        Hardware-reset the device via DTR and reopen at the default rate
+
+        If the port cannot be reopened, the link is left disconnected and
+        read_event() keeps retrying with backoff instead of raising.
+        """
+        self.resets += 1
+        self._pending_ping = None
+        self._missed_pings = 0
+        try:
+            if self.serial is not None and self.serial.is_open:
+                self.serial.dtr = False
+                time.sleep(0.1)
+                self.serial.dtr = True
+                self.serial.close()
+        except (serial.SerialException, OSError):
+            pass
+        self._reconnect(negotiate)
+
+    def _reconnect(self, negotiate: bool = True) -> bool:
+        """Try to reopen the port once; on failure schedule the next try"""
+        try:
+            if negotiate:
+                self.open()
+            else:
+                self._open_default()
+        except (serial.SerialException, OSError):
+            self._link_lost()
+            return False
+        if self.serial is None:
+            # A reset during baud negotiation could not reopen the port
+            return False
+        self._retry_delay = self.reconnect_delay
+        return True
+
+    def _link_lost(self):
+        try:
+            self.close()
+        except (serial.SerialException, OSError):
+            pass
+        self.serial = None
+        self._pending_ping = None
+        self._missed_pings = 0
+        self.reconnect_failures += 1
+        self._reconnect_at = time.monotonic() + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, self.max_reconnect_delay)
+
+    # -- ping -------------------------------------------------------------
+
+    def _send_ping(self) -> int:
+        digit = self._ping_digit
+        self._ping_digit = (self._ping_digit + 1) % 10
+        self.serial.write(str(digit).encode("ascii"))
+        self.pings_sent += 1
+        expected = (digit + 1) % 10
+        self._pending_ping = (expected, time.monotonic())
+        return expected
+
+    def ping(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Send one ping and wait for its reply, discarding other traffic
+
+        Returns:
+            Round-trip time in seconds, or None if no reply arrived
+        """
+        timeout = self.ping_timeout if timeout is None else timeout
+        expected = self._send_ping()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self._readline()
+            if line == f"P{expected}":
+                return self._ping_answered()
+        self._ping_lost()
+        return None
+
+    def _ping_answered(self) -> float:
+        rtt = time.monotonic() - self._pending_ping[1]
+        self._pending_ping = None
+        self._missed_pings = 0
+        self._rtts.append(rtt)
+        return rtt
+
+    def _ping_lost(self):
+        self._pending_ping = None
+        self._missed_pings += 1
+        self.pings_lost += 1
+
+    # -- baud negotiation -------------------------------------------------
+
+    def _wait_for(self, expected: str, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self._readline()
+            if line == expected:
+                return True
+            if line == "N":
+                return False
+        return False
+
+    def negotiate_baud(self, target: int) -> int:
+        """
+        Step up to the highest rate <= target that survives a ping check
+
+        Each attempt asks the sketch to switch, follows it, and pings. If the
+        ping fails, the host switches back (and lowers target_baud); the
+        sketch does the same after its confirm timeout. If the old rate is
+        dead too, the device is reset back to the default rate. Returns the
+        baud rate in use afterwards.
+        """
+        previous = self.baud
+        for baud in sorted((rate for rate in BAUD_RATES if previous < rate <= target), reverse=True):
+            index = BAUD_RATES.index(baud)
+            self.serial.write(b"B" + str(index).encode("ascii"))
+            if not self._wait_for(f"A{index}", self.ping_timeout * 2):
+                continue
+
+            self.serial.flush()
+            self.serial.baudrate = baud
+            self.serial.reset_input_buffer()
+            # A few tries inside the sketch's 1 s confirm window
+            for _ in range(3):
+                if self.ping(timeout=0.2) is not None:
+                    self.baud = baud
+                    return baud
+
+            # Don't retry this rate on later reconnects
+            lower = [rate for rate in BAUD_RATES if rate < baud]
+            self.target_baud = lower[-1]
+
+            # Both sides revert; give the sketch time to time out first
+            self.serial.baudrate = previous
+            time.sleep(1.1)
+            self.serial.reset_input_buffer()
+            if self.ping() is None:
+                self.reset(negotiate=False)
+                return self.baud
+        return self.baud
+
+    # -- reading ----------------------------------------------------------
+
+    def _readline(self) -> Optional[str]:
+        try:
+            raw = self.serial.readline()
+        except (serial.SerialException, OSError):
+            raw = b""
+        if not raw:
+            return None
+        now = time.monotonic()
+        self._last_rx = now
+        self.bytes_received += len(raw)
+        self._rx_window.append((now, len(raw)))
+        return raw.decode("ascii", errors="replace").strip()
+
+    def _check_health(self):
+        now = time.monotonic()
+        if self._pending_ping is not None and now - self._pending_ping[1] > self.ping_timeout:
+            self._ping_lost()
+        if self._missed_pings >= self.max_missed_pings or now - self._last_rx > self.stall_timeout:
+            self.reset()
+            return
+        if self._pending_ping is None and now >= self._next_ping_at:
+            self._send_ping()
+            self._next_ping_at = now + self.ping_interval
+
+    def read_event(self) -> Optional[Tuple[str, object]]:
+        """
+        Read the next sensor message, handling pings and link health inline
+
+        Returns:
+            ('motion', 'H' or 'L'), ('sound', int), or None if nothing arrived
+            or the port is gone and a reconnect is pending
+        """
+        if self.serial is None:
+            if time.monotonic() >= self._reconnect_at:
+                self._reconnect()
+            return None
+        try:
+            self._check_health()
+        except (serial.SerialException, OSError):
+            self._link_lost()
+            return None
+        if self.serial is None:
+            return None
+        line = self._readline()
+        if not line:
+            return None
+        kind = line[0]
+        if kind == "P":
+            if self._pending_ping is not None and line == f"P{self._pending_ping[0]}":
+                self._ping_answered()
+            return None
+        if kind in ("H", "L"):
+            return ("motion", kind)
+        if kind == "S":
+            try:
+                return ("sound", int(line[1:]))
+            except ValueError:
+                return None
+        return None
+
+    # -- stats ------------------------------------------------------------
+
+    def bytes_per_second(self, window: float = 5.0) -> float:
+        now = time.monotonic()
+        while self._rx_window and now - self._rx_window[0][0] > window:
+            self._rx_window.popleft()
+        return sum(size for _, size in self._rx_window) / window
+
+    def get_stats(self) -> dict:
+        rtts = list(self._rtts)
+        return {
+            'port': self.port,
+            'connected': self.connected,
+            'baud': self.baud,
+            'rtt_ms': rtts[-1] * 1000 if rtts else None,
+            'avg_rtt_ms': sum(rtts) / len(rtts) * 1000 if rtts else None,
+            'bytes_per_second': self.bytes_per_second(),
+            'bytes_received': self.bytes_received,
+            'pings_sent': self.pings_sent,
+            'pings_lost': self.pings_lost,
+            'resets': self.resets,
+            'reconnect_failures': self.reconnect_failures
+        }
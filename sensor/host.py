@@ -1,34 +1,51 @@
 #!/usr/bin/env python3
 
 import serial
-import threading
 import time
 
+from LinkManager import SerialLinkManager
+
+STATS_INTERVAL = 10  # seconds between link health reports
+
+def print_link_stats(stats):
+    if not stats['connected']:
+        print(f"🔌 Link {stats['port']} lost - reconnecting "
+              f"({stats['reconnect_failures']} failed attempts so far)")
+        return
+    rtt = f"{stats['rtt_ms']:.1f}ms" if stats['rtt_ms'] is not None else "n/a"
+    print(f"🔌 Link {stats['port']} @ {stats['baud']} baud | RTT {rtt} | "
+          f"{stats['bytes_per_second']:.0f} B/s | "
+          f"pings lost {stats['pings_lost']}/{stats['pings_sent']} | resets {stats['resets']}")
+
 def main():
     count = 0
+    link = SerialLinkManager('/dev/ttyACM1', target_baud=115200)
 
     try:
-        arduino = serial.Serial('/dev/ttyACM1', 9600)
-        time.sleep(2)  # Wait for Arduino reset
+        link.open()  # Waits for Arduino reset, then negotiates baud rate
+        print_link_stats(link.get_stats())
+        next_stats = time.monotonic() + STATS_INTERVAL
         while True:
-            resp = arduino.read()
-            if resp == b'H':
+            event = link.read_event()
+            if event == ('motion', 'H'):
                 print(f"({count}) ON")
-                
-            elif resp == b'L':
+
+            elif event == ('motion', 'L'):
                 print(f"({count}) OFF")
                 count = count + 1
-            else:
-                print("Invalid response")
+
+            if time.monotonic() >= next_stats:
+                print_link_stats(link.get_stats())
+                next_stats = time.monotonic() + STATS_INTERVAL
 
     except KeyboardInterrupt:
         print("Monitoring stopped")
     except PermissionError:
         print("Permission denied - check user permissions")
-    except FileNotFoundError:
+    except (FileNotFoundError, serial.SerialException):
         print("Port not found - verify device connection")
     finally:
-        arduino.close()
+        link.close()
 
 if __name__ == "__main__":
     main()
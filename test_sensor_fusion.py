@@ -0,0 +1,149 @@
+"""
+Ordering, dedupe, reboot and publish handling in FusionAggregator
+
+Run with:
+    python -m unittest test_sensor_fusion
+"""
+
+import unittest
+
+from SensorFusion import FusionAggregator
+
+
+def make_fusion(**kwargs):
+    return FusionAggregator("test-hall", max_capacity=1000, **kwargs)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyClient:
+    """Fails the first `failures` sends, then accepts"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    def send_update(self, level):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("network is down")
+        self.sent.append(level)
+        return {'success': True, 'crowdLevel': level}
+
+
+class FusionOrderingTest(unittest.TestCase):
+
+    def test_out_of_order_deltas_are_applied_in_order(self):
+        fusion = make_fusion()
+        self.assertTrue(fusion.ingest("door", 1, entries=5))
+        self.assertTrue(fusion.ingest("door", 3, exits=2))
+        # Exit is buffered until seq 2 arrives
+        self.assertEqual(fusion.restaurant.current_customers, 5)
+        self.assertTrue(fusion.ingest("door", 2, entries=1))
+        self.assertEqual(fusion.restaurant.current_customers, 4)
+
+    def test_retransmit_is_dropped(self):
+        fusion = make_fusion()
+        fusion.ingest("door", 1, entries=1)
+        self.assertFalse(fusion.ingest("door", 1, entries=1))
+        self.assertEqual(fusion.restaurant.current_customers, 1)
+        self.assertEqual(fusion.get_status()['sensors']['door']['duplicates'], 1)
+
+    def test_late_retransmit_far_behind_is_not_a_reboot(self):
+        fusion = make_fusion()
+        for seq in range(1, 101):
+            fusion.ingest("door", seq, entries=1)
+        self.assertFalse(fusion.ingest("door", 10, entries=1))
+        self.assertEqual(fusion.restaurant.current_customers, 100)
+
+        for seq in range(101, 111):
+            self.assertTrue(fusion.ingest("door", seq, entries=1))
+        self.assertEqual(fusion.restaurant.current_customers, 110)
+        self.assertEqual(fusion.get_status()['sensors']['door']['pending'], 0)
+
+    def test_early_reboot_with_new_epoch_keeps_traffic(self):
+        fusion = make_fusion()
+        for seq in range(1, 11):
+            fusion.ingest("door", seq, entries=1)
+        for seq in range(1, 6):
+            self.assertTrue(fusion.ingest("door", seq, entries=1, epoch=1))
+        self.assertEqual(fusion.restaurant.current_customers, 15)
+
+    def test_reordered_reports_after_reboot(self):
+        fusion = make_fusion()
+        fusion.ingest("door", 7, entries=1)
+        # Seq 2 of the new boot overtakes seq 1
+        fusion.ingest("door", 2, entries=1, epoch=1)
+        fusion.ingest("door", 1, entries=1, epoch=1)
+        self.assertEqual(fusion.restaurant.current_customers, 3)
+
+    def test_stale_epoch_is_dropped(self):
+        fusion = make_fusion()
+        fusion.ingest("door", 1, entries=1, epoch=2)
+        self.assertFalse(fusion.ingest("door", 50, entries=1, epoch=1))
+        self.assertEqual(fusion.restaurant.current_customers, 1)
+
+    def test_reboot_counts_discarded_pending_as_lost(self):
+        fusion = make_fusion()
+        fusion.ingest("door", 1, entries=1)
+        fusion.ingest("door", 3, entries=1)
+        fusion.ingest("door", 4, entries=1)
+        fusion.ingest("door", 1, entries=1, epoch=1)
+        sensor = fusion.get_status()['sensors']['door']
+        self.assertEqual(sensor['lost'], 2)
+        self.assertEqual(sensor['pending'], 0)
+        self.assertEqual(fusion.restaurant.current_customers, 2)
+
+    def test_gap_is_skipped_once_window_overflows(self):
+        fusion = make_fusion(reorder_window=4)
+        fusion.ingest("door", 1, entries=1)
+        for seq in range(3, 8):
+            fusion.ingest("door", seq, entries=1)
+        sensor = fusion.get_status()['sensors']['door']
+        self.assertEqual(sensor['lost'], 1)
+        self.assertEqual(fusion.restaurant.current_customers, 6)
+
+    def test_gap_is_skipped_after_timeout(self):
+        clock = FakeClock()
+        fusion = make_fusion(clock=clock, gap_timeout=30.0)
+        fusion.ingest("door", 1, entries=1)
+        fusion.ingest("door", 3, entries=1)
+        clock.now = 10.0
+        fusion.ingest("door", 4, entries=1)
+        self.assertEqual(fusion.restaurant.current_customers, 1)
+
+        # The door goes quiet; publishing still releases the buffered deltas
+        clock.now = 31.0
+        fusion.maybe_publish()
+        sensor = fusion.get_status()['sensors']['door']
+        self.assertEqual(sensor['lost'], 1)
+        self.assertEqual(sensor['pending'], 0)
+        self.assertEqual(fusion.restaurant.current_customers, 3)
+
+
+class FusionPublishTest(unittest.TestCase):
+
+    def test_failed_send_is_not_counted_as_published(self):
+        clock = FakeClock()
+        client = FlakyClient(failures=1)
+        fusion = make_fusion(client=client, clock=clock, publish_interval=5.0)
+        fusion.ingest("door", 1, entries=100)
+        with self.assertRaises(ConnectionError):
+            fusion.maybe_publish()
+        self.assertEqual(fusion.publish_count, 0)
+
+        # Same level, no interval wait: the next call retries the send
+        self.assertEqual(fusion.maybe_publish()['crowdLevel'], 10.0)
+        self.assertEqual(client.sent, [10.0])
+        self.assertEqual(fusion.publish_count, 1)
+        self.assertIsNone(fusion.maybe_publish())
+
+
+if __name__ == "__main__":
+    unittest.main()
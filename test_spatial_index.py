@@ -0,0 +1,112 @@
+"""
+SpatialIndex queries checked against a brute-force scan
+
+Run with:
+    python -m unittest test_spatial_index
+"""
+
+import random
+import unittest
+
+from SpatialIndex import SpatialIndex, haversine_m
+
+
+def brute_nearest(points, lat, lng, k, predicate=None, max_distance_m=None):
+    found = sorted(
+        (haversine_m(lat, lng, plat, plng), key)
+        for key, (plat, plng) in points.items()
+        if predicate is None or predicate(key)
+    )
+    if max_distance_m is not None:
+        found = [(dist, key) for dist, key in found if dist <= max_distance_m]
+    return found[:k]
+
+
+def brute_within(points, lat, lng, radius_m):
+    return sorted(
+        (dist, key)
+        for key, (plat, plng) in points.items()
+        for dist in (haversine_m(lat, lng, plat, plng),)
+        if dist <= radius_m
+    )
+
+
+def clustered_points(rng, clusters=30, per_cluster=40):
+    points = {}
+    for c in range(clusters):
+        clat = rng.uniform(-60, 60)
+        clng = rng.uniform(-180, 180)
+        for p in range(per_cluster):
+            lng = clng + rng.gauss(0, 0.01)
+            lng = (lng + 180.0) % 360.0 - 180.0
+            points[f"c{c}-{p}"] = (clat + rng.gauss(0, 0.01), lng)
+    return points
+
+
+class SpatialIndexBruteForceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.points = clustered_points(self.rng)
+        # A cluster straddling the antimeridian
+        for p in range(20):
+            lng = 180.0 + self.rng.gauss(0, 0.02)
+            self.points[f"am-{p}"] = (self.rng.gauss(10, 0.02), (lng + 180.0) % 360.0 - 180.0)
+        self.index = SpatialIndex()
+        for key, (lat, lng) in self.points.items():
+            self.index.insert(key, lat, lng)
+
+    def assertSameResults(self, got, expected):
+        self.assertEqual([key for _, key in got], [key for _, key in expected])
+        for (got_dist, _), (expected_dist, _) in zip(got, expected):
+            self.assertAlmostEqual(got_dist, expected_dist, places=6)
+
+    def queries(self, n=150):
+        keys = sorted(self.points)
+        for _ in range(n // 2):
+            lat, lng = self.points[self.rng.choice(keys)]
+            yield lat + self.rng.gauss(0, 0.005), lng
+        for _ in range(n // 2):
+            yield self.rng.uniform(-70, 70), self.rng.uniform(-180, 180)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lng in self.queries():
+            k = self.rng.choice([1, 5, 20])
+            self.assertSameResults(self.index.nearest(lat, lng, k), brute_nearest(self.points, lat, lng, k))
+
+    def test_nearest_with_predicate_and_cutoff(self):
+        allowed = {key for key in self.points if self.rng.random() < 0.1}
+        for lat, lng in self.queries():
+            self.assertSameResults(
+                self.index.nearest(lat, lng, 5, allowed.__contains__, max_distance_m=500000),
+                brute_nearest(self.points, lat, lng, 5, allowed.__contains__, 500000)
+            )
+
+    def test_predicate_rejecting_everything(self):
+        self.assertEqual(self.index.nearest(36.12, -97.07, 5, lambda key: False), [])
+
+    def test_nearest_across_antimeridian(self):
+        index = SpatialIndex()
+        index.insert("west", 0.0, -179.99999)
+        index.insert("east", 0.0, 179.99)
+        self.assertEqual(index.nearest(0.0, 179.99999)[0][1], "west")
+        self.assertEqual(index.within_radius(0.0, 179.99999, 10)[0][1], "west")
+
+    def test_within_radius_matches_brute_force(self):
+        for lat, lng in self.queries(60):
+            radius = self.rng.choice([500, 5000, 50000])
+            self.assertSameResults(
+                self.index.within_radius(lat, lng, radius),
+                brute_within(self.points, lat, lng, radius)
+            )
+
+    def test_results_follow_removals(self):
+        for key in list(self.points)[::3]:
+            self.index.remove(key)
+            del self.points[key]
+        for lat, lng in self.queries(40):
+            self.assertSameResults(self.index.nearest(lat, lng, 5), brute_nearest(self.points, lat, lng, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Round trips of the crowd level uplink codec
+
+The encoder lives in SensorClient.py; the binary decoder is repeated in
+functions/index.js and hackokstate25/sensor-daemon.js, so binary bodies
+are also decoded by both of those (when node is installed).
+
+Run with:
+    python -m unittest test_wire_format
+"""
+
+import gzip
+import importlib.util
+import json
+import random
+import shutil
+import subprocess
+import unittest
+
+HAS_REQUESTS = importlib.util.find_spec("requests") is not None
+if HAS_REQUESTS:
+    from SensorClient import BINARY_CONTENT_TYPE, decode_updates, encode_updates
+
+JS_DECODERS = ("functions/index.js", "hackokstate25/sensor-daemon.js")
+
+
+def sample_updates(count=300, seed=3):
+    rng = random.Random(seed)
+    location_ids = ["kerr-drummond", "caf_libro", "union-food-court"]
+    timestamp = 1760000000
+    updates = []
+    for _ in range(count):
+        timestamp += rng.randint(1, 90)
+        updates.append((
+            rng.choice(location_ids),
+            round(rng.uniform(0, 100), 2),
+            timestamp if rng.random() < 0.7 else None
+        ))
+    return updates
+
+
+def expected_records(updates):
+    return [
+        {"locationId": location_id, "crowdLevel": crowd_level, "timestamp": timestamp}
+        for location_id, crowd_level, timestamp in updates
+    ]
+
+
+def decode_with_node(path, body):
+    """Run the binary decoder block of a JS file on body"""
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+    start = source.index("const BINARY_CONTENT_TYPE")
+    end = source.index("// Normalize a request body")
+    script = source[start:end] + (
+        "\nprocess.stdout.write(JSON.stringify("
+        "decodeCrowdLevelBinary(require('fs').readFileSync(0))));\n"
+    )
+    result = subprocess.run(["node", "-e", script], input=body, capture_output=True, check=True)
+    return json.loads(result.stdout)
+
+
+@unittest.skipUnless(HAS_REQUESTS, "SensorClient needs the requests package")
+class WireFormatRoundTripTest(unittest.TestCase):
+
+    def round_trip(self, updates, wire_format):
+        body, headers = encode_updates(updates, wire_format)
+        return body, headers, decode_updates(body, headers["Content-Type"], headers.get("Content-Encoding"))
+
+    def test_json_batch_round_trip(self):
+        updates = sample_updates()
+        body, headers, decoded = self.round_trip(updates, "json")
+        self.assertEqual(headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(decoded, expected_records(updates))
+
+    def test_binary_batch_round_trip(self):
+        updates = sample_updates()
+        body, headers, decoded = self.round_trip(updates, "binary")
+        self.assertEqual(headers["Content-Type"], BINARY_CONTENT_TYPE)
+        self.assertEqual(headers.get("Content-Encoding"), "gzip")
+        self.assertEqual(decoded, expected_records(updates))
+
+    def test_single_location_without_timestamps(self):
+        updates = [("caf_libro", 12.5, None), ("caf_libro", 13.0, None)]
+        for wire_format in ("json", "binary"):
+            body, headers, decoded = self.round_trip(updates, wire_format)
+            self.assertNotIn("Content-Encoding", headers)
+            self.assertEqual(decoded, expected_records(updates))
+
+    def test_empty_batch_is_rejected(self):
+        for wire_format in ("json", "binary"):
+            with self.assertRaises(ValueError):
+                encode_updates([], wire_format)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_js_decoders_match(self):
+        for updates in (sample_updates(), sample_updates(5, seed=9), [("caf_libro", 40.0, None)]):
+            body, headers = encode_updates(updates, "binary")
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            for path in JS_DECODERS:
+                with self.subTest(path=path, count=len(updates)):
+                    self.assertEqual(decode_with_node(path, body), expected_records(updates))
+
+
+if __name__ == "__main__":
+    unittest.main()